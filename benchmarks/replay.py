@@ -0,0 +1,248 @@
+"""
+Banc de charge hors-ligne : rejoue une trace de requêtes contre les services
+lancés sous gunicorn, branchés sur le stub RapidAPI local (aucun quota consommé).
+
+Rapporte le débit, les latences p50 / p95 / p99 et le nombre d'appels amont,
+et compare à une référence enregistrée :
+
+    python benchmarks/replay.py --trace benchmarks/traces/sample.jsonl --repeat 5
+    python benchmarks/replay.py --trace ... --save-baseline benchmarks/baseline.json
+    python benchmarks/replay.py --trace ... --baseline benchmarks/baseline.json
+
+Référence versionnée (benchmarks/baseline.json), régénérée par :
+
+    python benchmarks/replay.py --trace benchmarks/traces/sample.jsonl --repeat 5 --save-baseline benchmarks/baseline.json
+
+Par défaut le quota RapidAPI est levé (débit, rafale et concurrence par hôte
+illimités) pour mesurer les services et non le seau à jetons ; --rate-limit
+rétablit un débit de plan.
+
+Trace : format lu par common.request_log (JSONL de payloads ou {"path", "payload"},
+ou lignes « Données reçues » affichées par les handlers).
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks import stub_server
+from common import request_log
+
+# Quota « illimité » du rejeu (débit, rafale, appels en vol par hôte)
+UNTHROTTLED = "1000000"
+
+# Service -> (dossier, préfixes de chemins servis)
+SERVICES = {
+    "flights": ("flights_api", ("/api/flights",)),
+    "hotels":  ("hotels_api",  ("/api/hotels",)),
+    "trip":    ("trip_api",    ("/api/trip", "/api/batch")),
+}
+
+
+def service_for(path: str) -> str | None:
+    for name, (_, prefixes) in SERVICES.items():
+        if path.startswith(prefixes):
+            return name
+    return None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, proc: subprocess.Popen, timeout: float = 20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn s'est arrêté (code {proc.returncode})")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"gunicorn ne répond pas sur le port {port}")
+
+
+def start_services(names, stub_url: str, args, workdir: str) -> dict:
+    """Lance un gunicorn par service ; retourne {nom: (process, url de base)}."""
+    if args.rate_limit is None:
+        quota = dict(RAPIDAPI_RATE_PER_SEC=UNTHROTTLED, RAPIDAPI_BURST=UNTHROTTLED,
+                     SCHEDULER_MAX_CONCURRENCY=UNTHROTTLED)
+    else:
+        quota = dict(RAPIDAPI_RATE_PER_SEC=str(args.rate_limit))
+    env = dict(
+        os.environ,
+        RAPIDAPI_KEY="benchmark",
+        RAPIDAPI_BASE_URL_FLIGHTS=stub_url,
+        RAPIDAPI_BASE_URL_HOTELS=stub_url,
+        GEO_INDEX_PATH=os.path.join(workdir, "geo_index.sqlite3"),
+        QUOTA_PATH=os.path.join(workdir, "quota.sqlite3"),
+        PREFETCH_LOG_PATH="",
+        WORKER_MODE=args.worker_mode,
+        **quota,
+    )
+    services = {}
+    for name in names:
+        directory, _ = SERVICES[name]
+        port = _free_port()
+        cmd = [
+            sys.executable, "-m", "gunicorn",
+            "--config", os.path.join(ROOT_DIR, "gunicorn.conf.py"),
+            "--chdir", os.path.join(ROOT_DIR, directory),
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(args.workers),
+            "--threads", str(args.threads),
+            *args.gunicorn_arg,
+            "app:app",
+        ]
+        log = open(os.path.join(workdir, f"{name}.log"), "w")
+        proc = subprocess.Popen(cmd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        services[name] = (proc, f"http://127.0.0.1:{port}")
+    for name, (proc, url) in services.items():
+        _wait_ready(int(url.rsplit(":", 1)[1]), proc)
+    return services
+
+
+def replay(entries, services: dict, concurrency: int, repeat: int) -> tuple[list, float]:
+    """Rejoue la trace ; retourne ([(chemin, statut, latence)], durée totale)."""
+    local = threading.local()
+
+    def send(entry):
+        path, payload = entry
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        url = services[service_for(path)][1] + path
+        start = time.perf_counter()
+        try:
+            status = session.post(url, json=payload, timeout=120).status_code
+        except requests.RequestException:
+            status = 0
+        return path, status, time.perf_counter() - start
+
+    jobs = [entry for _ in range(repeat) for entry in entries]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(send, jobs))
+    return samples, time.perf_counter() - start
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(q * len(sorted_values)) - 1, 0)]
+
+
+def _latency_summary(latencies) -> dict:
+    values = sorted(latencies)
+    return {
+        "p50":  round(_percentile(values, 0.50) * 1000, 1),
+        "p95":  round(_percentile(values, 0.95) * 1000, 1),
+        "p99":  round(_percentile(values, 0.99) * 1000, 1),
+        "mean": round(sum(values) / len(values) * 1000, 1) if values else 0.0,
+    }
+
+
+def summarize(samples, elapsed: float, upstream_calls: dict) -> dict:
+    by_path = defaultdict(list)
+    for path, _, latency in samples:
+        by_path[path].append(latency)
+    return {
+        "requests":       len(samples),
+        "errors":         sum(1 for _, status, _ in samples if not 200 <= status < 300),
+        "duration_s":     round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms":     _latency_summary([latency for _, _, latency in samples]),
+        "by_path":        {path: _latency_summary(values) for path, values in sorted(by_path.items())},
+        "upstream_calls": upstream_calls,
+        "upstream_total": sum(upstream_calls.values()),
+    }
+
+
+def compare(report: dict, baseline: dict):
+    """Affiche l'écart avec la référence (négatif = mieux pour latences et appels amont)."""
+    rows = [
+        ("throughput_rps", report["throughput_rps"], baseline["throughput_rps"]),
+        ("latency p50 ms", report["latency_ms"]["p50"], baseline["latency_ms"]["p50"]),
+        ("latency p95 ms", report["latency_ms"]["p95"], baseline["latency_ms"]["p95"]),
+        ("latency p99 ms", report["latency_ms"]["p99"], baseline["latency_ms"]["p99"]),
+        ("upstream calls", report["upstream_total"], baseline["upstream_total"]),
+        ("errors",         report["errors"], baseline["errors"]),
+    ]
+    print(f"{'métrique':<16}{'actuel':>12}{'référence':>12}{'écart':>10}")
+    for name, current, reference in rows:
+        delta = f"{(current - reference) / reference * 100:+.1f}%" if reference else "-"
+        print(f"{name:<16}{current:>12}{reference:>12}{delta:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu de trace contre les services (stub RapidAPI local).")
+    parser.add_argument("--trace", required=True, help="Trace de requêtes à rejouer.")
+    parser.add_argument("--repeat", type=int, default=1, help="Nombre de passes sur la trace.")
+    parser.add_argument("--warmup", type=int, default=0, help="Passes non mesurées avant le rejeu.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requêtes client simultanées.")
+    parser.add_argument("--workers", type=int, default=2, help="Workers gunicorn par service.")
+    parser.add_argument("--threads", type=int, default=8, help="Threads par worker gunicorn (mode sync).")
+    parser.add_argument("--worker-mode", choices=("sync", "async"), default="sync",
+                        help="Workers gunicorn synchrones ou gevent (cf. gunicorn.conf.py).")
+    parser.add_argument("--rate-limit", type=float,
+                        help="Débit RapidAPI simulé (appels/s) ; sans option, quota illimité.")
+    parser.add_argument("--gunicorn-arg", action="append", default=[], help="Option gunicorn supplémentaire.")
+    parser.add_argument("--output", help="Écrit le rapport JSON dans ce fichier.")
+    parser.add_argument("--save-baseline", help="Enregistre le rapport comme référence.")
+    parser.add_argument("--baseline", help="Compare le rapport à cette référence.")
+    stub_server.add_arguments(parser)
+    args = parser.parse_args()
+
+    entries = [(path, payload) for path, payload in request_log.read_entries(args.trace) if service_for(path)]
+    if not entries:
+        parser.error("Aucune requête exploitable dans la trace")
+
+    stub, stub_config = stub_server.start(0, **stub_server.stub_options(args))
+    stub_url = f"http://127.0.0.1:{stub.server_port}"
+    names    = sorted({service_for(path) for path, _ in entries})
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        services = start_services(names, stub_url, args, workdir)
+        try:
+            if args.warmup:
+                replay(entries, services, args.concurrency, args.warmup)
+                with stub_config.lock:
+                    stub_config.calls.clear()
+            samples, elapsed = replay(entries, services, args.concurrency, args.repeat)
+        finally:
+            for proc, _ in services.values():
+                proc.terminate()
+            for proc, _ in services.values():
+                proc.wait(timeout=10)
+    with stub_config.lock:
+        upstream_calls = dict(stub_config.calls)
+    stub.shutdown()
+
+    report = summarize(samples, elapsed, upstream_calls)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
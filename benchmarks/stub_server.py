@@ -0,0 +1,175 @@
+"""
+Stub local des endpoints RapidAPI utilisés par les services.
+
+- /api/v1/flights/searchDestination  -> aéroport dérivé de la ville (aucun si ville inconnue)
+- /api/v1/flights/searchFlights      -> fixtures/searchFlights.json
+- /v1/hotels/locations               -> dest_id dérivé de la ville (aucun si ville inconnue)
+- /v1/hotels/search                  -> fixtures/hotels_search.json (HOTEL_PAGES pages)
+
+Latence, taux d'erreurs 5xx, de 429 et de réponses tronquées configurables ; GET /__stats renvoie
+le nombre d'appels par endpoint, POST /__reset les remet à zéro.
+
+    python benchmarks/stub_server.py --port 8900 --latency 0.2 --error-rate 0.01
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _load_fixture(fixtures_dir, name):
+    with open(os.path.join(fixtures_dir, name), "rb") as f:
+        return f.read()
+
+
+class StubConfig:
+    def __init__(self, latency=0.15, jitter=0.05, error_rate=0.0, rate_limit_rate=0.0,
+                 truncate_rate=0.0, hotel_pages=3, unknown_cities=(), fixtures_dir=FIXTURES_DIR):
+        self.latency         = latency
+        self.jitter          = jitter
+        self.error_rate      = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.truncate_rate   = truncate_rate
+        self.hotel_pages     = hotel_pages
+        self.unknown_cities  = {city.lower() for city in unknown_cities}
+        self.flights_body    = _load_fixture(fixtures_dir, "searchFlights.json")
+        self.hotels_body     = _load_fixture(fixtures_dir, "hotels_search.json")
+        self.calls           = Counter()
+        self.lock            = threading.Lock()
+
+
+def _airport(city):
+    code = "".join(c for c in city.upper() if c.isalpha())[:3] or "XXX"
+    return {"data": [{"id": f"{code}.AIRPORT", "type": "AIRPORT", "name": city, "code": code, "cityName": city}]}
+
+
+def _location(city):
+    return [{"dest_type": "city", "dest_id": str(-(zlib.crc32(city.lower().encode()) % 10**7)), "name": city}]
+
+
+def make_handler(config: StubConfig):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body: bytes, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_truncated(self):
+            # Corps plus court que le Content-Length annoncé, puis connexion coupée
+            body = b'{"data": ['
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body) * 10))
+            self.end_headers()
+            self.wfile.write(body)
+            self.wfile.flush()
+            self.close_connection = True
+
+        def do_POST(self):
+            if self.path == "/__reset":
+                with config.lock:
+                    config.calls.clear()
+                return self._send(200, b"{}")
+            self._send(404, b"{}")
+
+        def do_GET(self):
+            url    = urlsplit(self.path)
+            query  = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == "/__stats":
+                with config.lock:
+                    return self._send(200, json.dumps(dict(config.calls)).encode())
+
+            with config.lock:
+                config.calls[url.path] += 1
+            time.sleep(max(config.latency + random.uniform(-config.jitter, config.jitter), 0))
+
+            roll = random.random()
+            if roll < config.rate_limit_rate:
+                return self._send(429, b'{"message": "Too many requests"}', {"Retry-After": "1"})
+            if roll < config.rate_limit_rate + config.error_rate:
+                return self._send(502, b'{"message": "Bad gateway"}')
+            if roll < config.rate_limit_rate + config.error_rate + config.truncate_rate:
+                return self._send_truncated()
+
+            city = query.get("query", query.get("name", ""))
+            if url.path == "/api/v1/flights/searchDestination":
+                if city.lower() in config.unknown_cities:
+                    return self._send(200, b'{"data": []}')
+                return self._send(200, json.dumps(_airport(city)).encode())
+            if url.path == "/api/v1/flights/searchFlights":
+                return self._send(200, config.flights_body)
+            if url.path == "/v1/hotels/locations":
+                if city.lower() in config.unknown_cities:
+                    return self._send(200, b"[]")
+                return self._send(200, json.dumps(_location(city)).encode())
+            if url.path == "/v1/hotels/search":
+                if int(query.get("page_number", 0)) >= config.hotel_pages:
+                    return self._send(200, b'{"count": 0, "result": []}')
+                return self._send(200, config.hotels_body)
+            self._send(404, b'{"message": "Endpoint does not exist"}')
+
+    return StubHandler
+
+
+def start(port=0, **options) -> tuple[ThreadingHTTPServer, StubConfig]:
+    """Démarre le stub dans un thread ; retourne (serveur, configuration)."""
+    config = StubConfig(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="rapidapi-stub", daemon=True).start()
+    return server, config
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.15, help="Latence moyenne (s).")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Variation de latence (s).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part de réponses 502.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Part de réponses 429.")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Part de réponses tronquées.")
+    parser.add_argument("--hotel-pages", type=int, default=3, help="Pages d'hôtels non vides.")
+    parser.add_argument("--unknown-city", action="append", default=[], help="Ville sans résultat amont.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Dossier des réponses enregistrées.")
+
+
+def stub_options(args) -> dict:
+    return {
+        "latency":         args.latency,
+        "jitter":          args.jitter,
+        "error_rate":      args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "truncate_rate":   args.truncate_rate,
+        "hotel_pages":     args.hotel_pages,
+        "unknown_cities":  args.unknown_city,
+        "fixtures_dir":    args.fixtures,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub local RapidAPI (Booking vols / hôtels).")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server, _ = start(args.port, **stub_options(args))
+    print(f"[🧪 Stub RapidAPI] http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,134 @@
+"""
+Cache en mémoire (TTL + LRU) des résultats de recherche bruts.
+
+Les appels concurrents sur une même clé absente sont fusionnés : un seul
+appel amont est lancé, les autres requêtes attendent son résultat.
+Une entrée expirée reste servie pendant une période de grâce
+(stale-while-revalidate) pendant qu'elle est rafraîchie en arrière-plan.
+Les erreurs ne sont jamais mises en cache.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from common import metrics, scheduler
+from common.log import get_logger
+
+load_dotenv()
+SEARCH_CACHE_SIZE            = int(os.getenv("SEARCH_CACHE_SIZE") or 1024)
+SEARCH_CACHE_TTL             = float(os.getenv("SEARCH_CACHE_TTL") or 300)        # secondes
+SEARCH_CACHE_STALE_TTL       = float(os.getenv("SEARCH_CACHE_STALE_TTL") or 600)  # grâce après expiration
+SEARCH_CACHE_REFRESH_WORKERS = int(os.getenv("SEARCH_CACHE_REFRESH_WORKERS") or 4)
+
+logger = get_logger("cache")
+
+# Rafraîchissements en arrière-plan, séparés du pool des requêtes
+_refresher = ThreadPoolExecutor(max_workers=SEARCH_CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+
+
+class InFlight:
+    """Appel amont en cours, partagé par toutes les requêtes sur la même clé."""
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SearchCache:
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = SEARCH_CACHE_SIZE,
+        ttl: float = SEARCH_CACHE_TTL,
+        stale_ttl: float = SEARCH_CACHE_STALE_TTL,
+    ):
+        self.name      = name
+        self.maxsize   = maxsize
+        self.ttl       = ttl
+        self.stale_ttl = stale_ttl
+        self._data     = OrderedDict()   # clé -> (expires_at, valeur)
+        self._inflight = {}
+        self._lock     = threading.Lock()
+        self._counters = {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "evictions": 0}
+
+    def _count(self, event: str):
+        self._counters[event] += 1
+        metrics.CACHE_EVENTS.labels(self.name, event).inc()
+
+    def get_or_load(self, key, loader):
+        """Retourne la valeur en cache pour `key`, sinon appelle `loader()` une seule fois."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] + self.stale_ttl > now:
+                self._data.move_to_end(key)
+                if entry[0] > now:
+                    self._count("hits")
+                    return entry[1]
+                # Périmée mais dans la période de grâce : servie, puis rafraîchie
+                self._count("stale")
+                if key not in self._inflight:
+                    flight = self._inflight[key] = InFlight()
+                    self._count("refreshes")
+                    _refresher.submit(contextvars.copy_context().run, self._refresh, key, loader, flight)
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = InFlight()
+                self._count("misses")
+            else:
+                self._count("coalesced")
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        return self._load(key, loader, flight)
+
+    def _load(self, key, loader, flight: InFlight):
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            self._store(key, flight.value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+        return flight.value
+
+    def _refresh(self, key, loader, flight: InFlight):
+        try:
+            with scheduler.background():
+                self._load(key, loader, flight)
+        except Exception as e:
+            logger.warning("[Erreur rafraîchissement cache %s] %s", self.name, e)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._count("evictions")
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters, size=len(self._data), maxsize=self.maxsize)
+        lookups = stats["hits"] + stats["stale"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale"] + stats["coalesced"]) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,89 @@
+"""
+Exécution concurrente des appels amont avec une échéance par requête.
+
+Les tâches tournent dans un pool de threads partagé par le process ; une
+tâche qui dépasse l'échéance est signalée par le marqueur "timeout" au lieu
+de bloquer le worker (elle se termine en arrière-plan).
+"""
+
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+from common.log import get_logger
+
+load_dotenv()
+UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS") or 32)
+
+logger = get_logger("concurrency")
+
+executor = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix="upstream")
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+
+def iter_completed(tasks: dict, deadline: Deadline, max_concurrency: int | None = None,
+                   pool: ThreadPoolExecutor | None = None):
+    """
+    Lance `tasks` ({nom: callable}) en parallèle et produit
+    (nom, résultat, erreur) dans l'ordre de terminaison.
+    `erreur` vaut None, "timeout", le `code` de l'exception levée
+    (ex. "rate_limited") ou "error".
+    Avec `max_concurrency`, au plus ce nombre de tâches tournent à la fois.
+    Une tâche qui lance elle-même des sous-tâches doit les confier à un autre
+    `pool` que le sien : sous charge, ses sous-tâches attendraient sinon des
+    threads occupés par les tâches parentes jusqu'à l'échéance.
+    """
+    pool    = pool or executor
+    queue   = iter(tasks.items())
+    futures = {}
+    pending = set()
+
+    def submit_next():
+        for name, fn in queue:
+            # Le contexte (priorité, compteur d'appels) suit la tâche dans le pool
+            future = pool.submit(contextvars.copy_context().run, fn)
+            futures[future] = name
+            pending.add(future)
+            return
+
+    for _ in range(max_concurrency or len(tasks)):
+        submit_next()
+    while pending:
+        done, not_done = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        pending.difference_update(done)
+        for future in done:
+            submit_next()
+            name = futures[future]
+            try:
+                yield name, future.result(), None
+            except Exception as e:
+                logger.warning("[Erreur tâche %s] %s", name, e)
+                yield name, None, getattr(e, "code", "error")
+    for future in pending:
+        future.cancel()
+        yield futures[future], None, "timeout"
+    # Tâches jamais lancées faute de temps
+    for name, _ in queue:
+        yield name, None, "timeout"
+
+
+def run_concurrently(tasks: dict, deadline: Deadline, max_concurrency: int | None = None,
+                     pool: ThreadPoolExecutor | None = None) -> tuple[dict, dict]:
+    """Retourne ({nom: résultat}, {nom: erreur}) une fois toutes les tâches terminées ou l'échéance atteinte."""
+    results, errors = {}, {}
+    for name, result, error in iter_completed(tasks, deadline, max_concurrency, pool):
+        if error:
+            errors[name] = error
+        else:
+            results[name] = result
+    return results, errors
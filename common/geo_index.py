@@ -0,0 +1,156 @@
+"""
+Index local ville -> identifiant amont (code aéroport, dest_id Booking).
+
+Les résolutions sont stockées dans un fichier SQLite (mode WAL) partagé par
+tous les workers gunicorn : une ville n'est demandée à RapidAPI qu'une fois
+par TTL, y compris quand elle est inconnue (cache négatif), et les résolutions
+simultanées d'une même ville sont regroupées en un seul appel.
+"""
+
+import os
+import threading
+import time
+import unicodedata
+from dotenv import load_dotenv
+from common.cache import InFlight
+from common.log import get_logger
+from common.sqlite import connect
+
+load_dotenv()
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GEO_INDEX_PATH         = os.getenv("GEO_INDEX_PATH") or os.path.join(ROOT_DIR, "geo_index.sqlite3")
+GEO_INDEX_TTL          = int(os.getenv("GEO_INDEX_TTL") or 30 * 24 * 3600)   # 30 jours
+GEO_INDEX_NEGATIVE_TTL = int(os.getenv("GEO_INDEX_NEGATIVE_TTL") or 24 * 3600)  # 1 jour
+
+logger = get_logger("geo_index")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geo_lookup (
+    kind       TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID
+"""
+
+
+def normalize_city(name: str | None) -> str:
+    """Clé normalisée : sans accents, casse ni espaces superflus."""
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+
+class GeoIndex:
+    def __init__(self, path: str, ttl: int, negative_ttl: int):
+        self.path         = path
+        self.ttl          = ttl
+        self.negative_ttl = negative_ttl
+        self._inflight    = {}
+        self._lock        = threading.Lock()
+
+    def _conn(self):
+        return connect(self.path, _SCHEMA)
+
+    def get(self, kind: str, city: str) -> tuple[bool, str | None, bool]:
+        """Retourne (trouvé, valeur, expiré)."""
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM geo_lookup WHERE kind = ? AND key = ?",
+            (kind, normalize_city(city)),
+        ).fetchone()
+        if row is None:
+            return False, None, False
+        return True, row[0], row[1] <= time.time()
+
+    def put(self, kind: str, city: str, value: str | None):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self._conn().execute(
+            "INSERT OR REPLACE INTO geo_lookup (kind, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (kind, normalize_city(city), value, time.time() + ttl),
+        )
+
+    def resolve(self, kind: str, city: str | None, fetch) -> str | None:
+        """
+        Résout `city` via l'index, sinon via `fetch(city)`.
+        `fetch` retourne None pour une ville inconnue (mise en cache négatif)
+        et lève une exception en cas d'erreur amont (rien n'est mis en cache,
+        l'ancienne valeur est servie si elle existe).
+        """
+        if not normalize_city(city):
+            return None
+        found, value, expired = self.get(kind, city)
+        if found and not expired:
+            return value
+
+        # Une seule résolution amont par ville à la fois dans ce process
+        key = (kind, normalize_city(city))
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = InFlight()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._fetch(kind, city, fetch, value if found else None, found)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+        return flight.value
+
+    def _fetch(self, kind: str, city: str, fetch, stale: str | None, found: bool) -> str | None:
+        try:
+            value = fetch(city)
+        except Exception:
+            if found:
+                return stale
+            raise
+        self.put(kind, city, value)
+        return value
+
+    def warm(self, kind: str, cities, fetch, force: bool = False) -> dict:
+        """Pré-remplit l'index pour une liste de villes (commande de warm-up)."""
+        stats = {"resolved": 0, "unknown": 0, "skipped": 0, "errors": 0}
+        for city in cities:
+            if not normalize_city(city):
+                continue
+            found, _, expired = self.get(kind, city)
+            if found and not expired and not force:
+                stats["skipped"] += 1
+                continue
+            try:
+                value = fetch(city)
+            except Exception as e:
+                logger.warning("[Erreur warm-up %s] %s: %s", kind, city, e)
+                stats["errors"] += 1
+                continue
+            self.put(kind, city, value)
+            stats["resolved" if value is not None else "unknown"] += 1
+        return stats
+
+    def purge_expired(self) -> int:
+        cur = self._conn().execute("DELETE FROM geo_lookup WHERE expires_at <= ?", (time.time(),))
+        return cur.rowcount
+
+
+index = GeoIndex(GEO_INDEX_PATH, GEO_INDEX_TTL, GEO_INDEX_NEGATIVE_TTL)
+
+
+def resolve(kind: str, city: str | None, fetch) -> str | None:
+    return index.resolve(kind, city, fetch)
+
+
+def warm(kind: str, cities, fetch, force: bool = False) -> dict:
+    return index.warm(kind, cities, fetch, force)
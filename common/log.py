@@ -0,0 +1,76 @@
+"""
+Journalisation non bloquante et échantillonnée.
+
+Les handlers ne font que déposer les enregistrements dans une file ; un
+thread d'écoute (un par process, redémarré après le fork gunicorn) les écrit
+sur la sortie standard. Sous WARNING, seule une fraction LOG_SAMPLE_RATE des
+enregistrements est conservée : les lignes « Données reçues » restent
+exploitables par le préchargeur, dont le classement ne dépend que des
+proportions.
+"""
+
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from dotenv import load_dotenv
+
+load_dotenv()
+LOG_LEVEL       = (os.getenv("LOG_LEVEL") or "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE") or 0.1)
+LOG_FORMAT      = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+ROOT_LOGGER = "traveloo"
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class _ProcessQueueHandler(QueueHandler):
+    """QueueHandler qui (re)démarre son thread d'écoute dans chaque process."""
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self._pid      = None
+        self._lock     = threading.Lock()
+        self._listener = None
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(logging.Formatter(LOG_FORMAT))
+            self._listener = QueueListener(self.queue, stream)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        super().enqueue(record)
+
+
+_handler = _ProcessQueueHandler()
+_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+
+_root = logging.getLogger(ROOT_LOGGER)
+_root.setLevel(LOG_LEVEL)
+_root.addHandler(_handler)
+_root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger `traveloo.<name>` branché sur la file commune."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,91 @@
+"""
+Mesures Prometheus des services.
+
+- durée de chaque étape (résolution de ville, recherche, filtrage,
+  formatage, sérialisation) via `span("étape")` ;
+- appels amont par hôte et code HTTP, et leur durée ;
+- événements des caches de recherche (hits, stale, misses...) ;
+- temps d'attente dans l'ordonnanceur de quota ;
+- durée des requêtes HTTP par endpoint.
+
+`init_app(app, "flights")` expose GET /metrics. Sous gunicorn multi-workers,
+définir PROMETHEUS_MULTIPROC_DIR (dossier vide au démarrage) pour agréger
+les mesures de tous les workers.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+
+_service = "unknown"
+
+STAGE_SECONDS = Histogram(
+    "traveloo_stage_duration_seconds", "Durée des étapes de traitement",
+    ["service", "stage"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_SECONDS = Histogram(
+    "traveloo_http_request_duration_seconds", "Durée des requêtes HTTP",
+    ["service", "endpoint", "status"],
+)
+UPSTREAM_REQUESTS = Counter(
+    "traveloo_upstream_requests_total", "Appels amont par hôte et code HTTP",
+    ["host", "status"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "traveloo_upstream_request_duration_seconds", "Durée des appels amont",
+    ["host"],
+)
+CACHE_EVENTS = Counter(
+    "traveloo_cache_events_total", "Événements des caches de recherche",
+    ["cache", "event"],
+)
+QUEUE_SECONDS = Histogram(
+    "traveloo_scheduler_queue_seconds", "Attente dans l'ordonnanceur amont",
+    ["priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+@contextmanager
+def span(stage: str):
+    """Mesure la durée du bloc comme étape `stage` du service courant."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(_service, stage).observe(time.perf_counter() - start)
+
+
+def _registry():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def init_app(app, service: str):
+    """Enregistre le service, la mesure des requêtes et l'endpoint GET /metrics."""
+    global _service
+    _service = service
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        start = g.pop("metrics_start", None)
+        if start is not None and request.url_rule is not None:
+            REQUEST_SECONDS.labels(service, request.url_rule.rule, str(response.status_code)).observe(
+                time.perf_counter() - start)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,120 @@
+"""
+Préchargement des recherches populaires.
+
+Le préchargeur lit les dernières lignes du journal de requêtes, classe les
+recherches les plus fréquentes (couple de villes + fenêtre de dates) et les
+rejoue pour garder le cache chaud. Il tourne dans chaque worker, puisque le
+cache est en mémoire, mais son budget d'appels amont (recherches et
+résolutions de villes qu'il déclenche lui-même) est un seau à jetons partagé
+par tous les workers : PREFETCH_BUDGET appels par PREFETCH_INTERVAL.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date
+from dotenv import load_dotenv
+from common import request_log, scheduler, upstream
+from common.log import get_logger
+from common.quota import SharedBuckets, buckets
+
+load_dotenv()
+PREFETCH_LOG_PATH  = os.getenv("PREFETCH_LOG_PATH")
+PREFETCH_LOG_LINES = int(os.getenv("PREFETCH_LOG_LINES") or 5000)
+PREFETCH_BUDGET    = int(os.getenv("PREFETCH_BUDGET") or 20)     # appels amont max par cycle, tous workers
+PREFETCH_INTERVAL  = float(os.getenv("PREFETCH_INTERVAL") or 240)  # secondes, < SEARCH_CACHE_TTL
+
+logger = get_logger("prefetch")
+
+
+def is_upcoming(iso_date: str | None) -> bool:
+    """Ignore les recherches dont la date est passée ou invalide."""
+    try:
+        return date.fromisoformat(iso_date) >= date.today()
+    except (TypeError, ValueError):
+        return False
+
+
+class Prefetcher:
+    def __init__(
+        self,
+        name: str,
+        endpoint: str,
+        extract,
+        warm,
+        log_path: str | None = PREFETCH_LOG_PATH,
+        budget: int = PREFETCH_BUDGET,
+        interval: float = PREFETCH_INTERVAL,
+        shared: SharedBuckets = buckets,
+    ):
+        """
+        extract(payload) -> clé hashable de la recherche, ou None pour l'ignorer
+        warm(clé)        -> rejoue la recherche (passe par les caches)
+        """
+        self.name     = name
+        self.endpoint = endpoint
+        self.extract  = extract
+        self.warm     = warm
+        self.log_path = log_path
+        self.budget   = budget
+        self.interval = interval
+        self._shared  = shared
+        self._key     = f"prefetch:{name}"
+        self._pid     = None
+        self._lock    = threading.Lock()
+
+    def _bucket(self) -> tuple[str, float, float]:
+        return self._key, self.budget / self.interval, self.budget
+
+    def rank(self) -> list[tuple]:
+        """Recherches du journal, de la plus fréquente à la moins fréquente."""
+        counts = Counter()
+        for endpoint, payload in request_log.read_entries(self.log_path, PREFETCH_LOG_LINES):
+            if endpoint != self.endpoint:
+                continue
+            try:
+                key = self.extract(payload)
+            except (TypeError, ValueError):
+                continue
+            if key is not None:
+                counts[key] += 1
+        return [key for key, _ in counts.most_common()]
+
+    def run_once(self) -> dict:
+        stats = {"warmed": 0, "upstream_calls": 0}
+        with upstream.counting() as calls:
+            for key in self.rank():
+                if self._shared.available(*self._bucket()) < 1:
+                    break
+                before = calls.value
+                try:
+                    self.warm(key)
+                    stats["warmed"] += 1
+                except Exception as e:
+                    logger.warning("[Erreur préchargement %s] %s: %s", self.name, key, e)
+                finally:
+                    # Seuls les appels déclenchés par ce préchargement sont débités
+                    self._shared.debit(*self._bucket(), calls.value - before)
+            stats["upstream_calls"] = calls.value
+        return stats
+
+    def _loop(self):
+        while True:
+            try:
+                with scheduler.background():
+                    stats = self.run_once()
+                logger.info("[🔥 Préchargement %s] %s", self.name, stats)
+            except Exception as e:
+                logger.warning("[Erreur préchargement %s] %s", self.name, e)
+            time.sleep(self.interval)
+
+    def ensure_started(self):
+        """Démarre le thread de préchargement une fois par process (après le fork gunicorn)."""
+        if not self.log_path or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, name=f"prefetch-{self.name}", daemon=True).start()
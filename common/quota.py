@@ -0,0 +1,88 @@
+"""
+Seaux à jetons partagés par tous les process (workers gunicorn, services).
+
+L'état de chaque seau (jetons, dernière recharge, pause) est stocké dans un
+fichier SQLite en mode WAL, comme l'index des villes : le débit d'un plan
+RapidAPI est respecté quel que soit le nombre de workers et de services.
+Chaque prise de jeton est une transaction courte (BEGIN IMMEDIATE) ; la
+lecture du solde (stats, budget du préchargement) n'écrit rien.
+"""
+
+import os
+import time
+from dotenv import load_dotenv
+from common.sqlite import connect
+
+load_dotenv()
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUOTA_PATH = os.getenv("QUOTA_PATH") or os.path.join(ROOT_DIR, "quota.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key          TEXT PRIMARY KEY,
+    tokens       REAL NOT NULL,
+    refilled_at  REAL NOT NULL,
+    paused_until REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID
+"""
+
+
+class SharedBuckets:
+    def __init__(self, path: str):
+        self.path = path
+
+    def _state(self, conn, key: str, rate: float, burst: float, now: float) -> tuple[float, float]:
+        """(jetons rechargés jusqu'à `now`, pause_jusqu'à) du seau `key`."""
+        row = conn.execute(
+            "SELECT tokens, refilled_at, paused_until FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return burst, 0.0
+        return min(burst, row[0] + max(now - row[1], 0) * rate), row[2]
+
+    def _update(self, key: str, rate: float, burst: float, change):
+        """
+        Recharge le seau `key` puis applique `change(jetons, pause_jusqu'à, maintenant)`,
+        qui retourne (jetons, pause_jusqu'à, résultat) ; retourne le résultat.
+        """
+        conn = connect(self.path, _SCHEMA)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            tokens, paused_until = self._state(conn, key, rate, burst, now)
+            tokens, paused_until, result = change(tokens, paused_until, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, refilled_at, paused_until) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, paused_until),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def try_take(self, key: str, rate: float, burst: float) -> float:
+        """Prend un jeton : retourne 0, ou le délai (secondes) avant d'en obtenir un."""
+        def change(tokens, paused_until, now):
+            if now < paused_until:
+                return tokens, paused_until, paused_until - now
+            if tokens >= 1:
+                return tokens - 1, paused_until, 0.0
+            return tokens, paused_until, (1 - tokens) / rate
+        return self._update(key, rate, burst, change)
+
+    def debit(self, key: str, rate: float, burst: float, amount: float) -> float:
+        """Retire `amount` jetons après coup (solde négatif possible) ; retourne le solde."""
+        return self._update(key, rate, burst, lambda tokens, paused, now: (tokens - amount, paused, tokens - amount))
+
+    def available(self, key: str, rate: float, burst: float) -> float:
+        """Solde actuel du seau, recharge comprise, sans écriture."""
+        return self._state(connect(self.path, _SCHEMA), key, rate, burst, time.time())[0]
+
+    def pause(self, key: str, rate: float, burst: float, seconds: float):
+        """Suspend le seau pour tous les process (ex. Retry-After d'un 429)."""
+        self._update(key, rate, burst, lambda tokens, paused, now: (tokens, max(paused, now + seconds), None))
+
+
+buckets = SharedBuckets(QUOTA_PATH)
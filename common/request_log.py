@@ -0,0 +1,68 @@
+"""
+Lecture des journaux de requêtes pour le préchargement et le rejeu.
+
+Formats acceptés, une entrée par ligne :
+  - JSON : soit le payload lui-même, soit un objet {"path": ..., "payload": {...}} ;
+  - les lignes journalisées par les handlers :
+    "[📥 API Flights] Données reçues: {...}" (repr Python du payload).
+"""
+
+import ast
+import json
+from collections import deque
+
+_PRINTED_MARKER = "Données reçues:"
+
+# Préfixe de log -> endpoint (le plus spécifique d'abord)
+_LOG_PATHS = (
+    ("API Flights Calendar", "/api/flights/calendar"),
+    ("API Flights",          "/api/flights"),
+    ("API Hôtel",            "/api/hotels"),
+    ("API Trip",             "/api/trip"),
+)
+
+
+def parse_line(line: str) -> tuple[str | None, dict] | None:
+    """Retourne (chemin de l'endpoint si connu, payload) ou None si la ligne est ignorée."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith("{"):
+            obj = json.loads(line)
+            if isinstance(obj.get("payload"), dict):
+                return obj.get("path"), obj["payload"]
+            return None, obj
+        if _PRINTED_MARKER in line:
+            payload = ast.literal_eval(line.split(_PRINTED_MARKER, 1)[1].strip())
+            if isinstance(payload, dict):
+                path = next((path for prefix, path in _LOG_PATHS if prefix in line), None)
+                return path, payload
+    except (ValueError, SyntaxError):
+        pass
+    return None
+
+
+def guess_path(payload: dict) -> str | None:
+    """Endpoint correspondant à un payload sans chemin explicite."""
+    if "from" in payload and "to" in payload:
+        return "/api/flights"
+    if "destination" in payload:
+        return "/api/hotels"
+    return None
+
+
+def read_entries(path: str, max_lines: int | None = None) -> list[tuple[str, dict]]:
+    """Lit les `max_lines` dernières lignes exploitables du journal : [(chemin, payload)]."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines = deque(f, maxlen=max_lines) if max_lines else list(f)
+    entries = []
+    for line in lines:
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        endpoint, payload = parsed
+        endpoint = endpoint or guess_path(payload)
+        if endpoint:
+            entries.append((endpoint, payload))
+    return entries
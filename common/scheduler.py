@@ -0,0 +1,170 @@
+"""
+Ordonnanceur des appels amont, conscient du quota RapidAPI.
+
+- un ordonnanceur par hôte amont (vols et hôtels ont des quotas distincts) ;
+- seau à jetons au débit du plan, partagé par tous les workers et services
+  (common.quota) ;
+- concurrence adaptative (AIMD, par process) : divisée par deux sur 429,
+  puis remontée progressivement ; pause de tous les process pendant le
+  `Retry-After` ;
+- priorités : les recherches interactives passent avant le préchargement,
+  le warm-up et les rafraîchissements en arrière-plan ;
+- mesures du temps passé en file d'attente.
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from common import metrics
+from common.quota import SharedBuckets, buckets
+
+load_dotenv()
+RAPIDAPI_RATE_PER_SEC     = float(os.getenv("RAPIDAPI_RATE_PER_SEC") or 5)
+RAPIDAPI_BURST            = float(os.getenv("RAPIDAPI_BURST") or 10)
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv("SCHEDULER_MAX_CONCURRENCY") or 16)
+SCHEDULER_MAX_WAIT        = float(os.getenv("SCHEDULER_MAX_WAIT") or 10)   # secondes en file max
+SCHEDULER_429_BACKOFF     = float(os.getenv("SCHEDULER_429_BACKOFF") or 1)  # sans Retry-After
+
+INTERACTIVE = 0
+BACKGROUND  = 1
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_priority = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background():
+    """Les appels amont faits dans ce bloc passent après les recherches interactives."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class QueueTimeout(Exception):
+    """Attente en file trop longue : le quota est saturé."""
+
+
+class Scheduler:
+    def __init__(
+        self,
+        host: str,
+        rate: float = RAPIDAPI_RATE_PER_SEC,
+        burst: float = RAPIDAPI_BURST,
+        max_concurrency: int = SCHEDULER_MAX_CONCURRENCY,
+        max_wait: float = SCHEDULER_MAX_WAIT,
+        shared: SharedBuckets = buckets,
+    ):
+        self.host            = host
+        self.rate            = rate
+        self.burst           = burst
+        self.max_concurrency = max_concurrency
+        self.max_wait        = max_wait
+        self.limit           = float(max_concurrency)
+        self._shared         = shared
+        self._key            = f"upstream:{host}"
+        self._in_flight      = 0
+        self._waiters        = []   # tas de (priorité, ordre d'arrivée)
+        self._seq            = itertools.count()
+        self._cond           = threading.Condition()
+        self._queue_stats    = {
+            name: {"count": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for name in _PRIORITY_NAMES.values()
+        }
+        self._throttled      = 0
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un créneau d'appel, selon la priorité du contexte."""
+        priority = _priority.get()
+        entry    = (priority, next(self._seq))
+        start    = time.monotonic()
+        deadline = start + self.max_wait
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    # Seule la tête de file interroge le seau partagé ; None : attendre une libération
+                    timeout = None
+                    if self._waiters[0] == entry and self._in_flight < int(self.limit):
+                        timeout = self._shared.try_take(self._key, self.rate, self.burst)
+                        if not timeout:
+                            break
+                    if now >= deadline:
+                        raise QueueTimeout("File d'attente amont saturée")
+                    self._cond.wait(min(max(timeout or deadline - now, 0.001), deadline - now))
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            self._in_flight += 1
+            self._record_wait(priority, time.monotonic() - start)
+            self._cond.notify_all()
+
+    def release(self, status: int | None = None, retry_after: float | None = None):
+        """Libère le créneau et adapte la concurrence selon le statut amont."""
+        with self._cond:
+            self._in_flight -= 1
+            if status == 429:
+                self._throttled += 1
+                self.limit = max(1.0, self.limit / 2)
+                pause = retry_after if retry_after is not None else SCHEDULER_429_BACKOFF
+                self._shared.pause(self._key, self.rate, self.burst, pause)
+            elif status is not None and status < 500:
+                # Remontée additive : environ +1 par « tour » de `limit` appels réussis
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def _record_wait(self, priority: int, waited: float):
+        name  = _PRIORITY_NAMES.get(priority, "background")
+        stats = self._queue_stats[name]
+        metrics.QUEUE_SECONDS.labels(name).observe(waited)
+        stats["count"]      += 1
+        stats["total_wait"] += waited
+        stats["max_wait"]    = max(stats["max_wait"], waited)
+
+    def stats(self) -> dict:
+        with self._cond:
+            queues = {
+                name: {
+                    "count":    s["count"],
+                    "avg_wait": round(s["total_wait"] / s["count"], 4) if s["count"] else 0.0,
+                    "max_wait": round(s["max_wait"], 4),
+                }
+                for name, s in self._queue_stats.items()
+            }
+            return {
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight":         self._in_flight,
+                "queued":            len(self._waiters),
+                "tokens":            round(self._shared.available(self._key, self.rate, self.burst), 2),
+                "throttled":         self._throttled,
+                "queue_time":        queues,
+            }
+
+
+_schedulers = {}
+_registry_lock = threading.Lock()
+
+
+def for_host(host: str) -> Scheduler:
+    """Ordonnanceur de l'hôte amont `host` (créé au premier appel)."""
+    with _registry_lock:
+        scheduler = _schedulers.get(host)
+        if scheduler is None:
+            scheduler = _schedulers[host] = Scheduler(host)
+        return scheduler
+
+
+def stats() -> dict:
+    with _registry_lock:
+        schedulers = dict(_schedulers)
+    return {host: scheduler.stats() for host, scheduler in schedulers.items()}
@@ -0,0 +1,38 @@
+"""
+Connexions SQLite (mode WAL) des fichiers partagés entre workers : index des
+villes (common.geo_index) et seaux à jetons (common.quota).
+
+Une connexion par fichier, par process et par thread système : les workers
+gunicorn forkent, et en mode async (gevent) toutes les greenlets d'un worker
+partagent le même thread système, donc la même connexion, au lieu d'en ouvrir
+une (PRAGMA + CREATE TABLE) par requête comme le ferait `threading.local`.
+Les appels sqlite3 ne cèdent pas la main : une transaction n'est jamais
+entrelacée avec celle d'une autre greenlet, mais l'attente d'un verrou tenu
+par un autre process (`timeout`) bloque tout le worker ; les transactions
+d'écriture doivent rester courtes.
+"""
+
+import os
+import sqlite3
+import threading
+
+SQLITE_BUSY_TIMEOUT = 5  # secondes
+
+_connections = {}
+_lock        = threading.Lock()
+
+
+def connect(path: str, schema: str) -> sqlite3.Connection:
+    """Connexion en autocommit à `path` pour le process et le thread système courants."""
+    key = (path, os.getpid(), threading.get_native_id())
+    conn = _connections.get(key)
+    if conn is None:
+        # check_same_thread : la clé garantit déjà un seul thread système par connexion
+        conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(schema)
+        with _lock:
+            _connections[key] = conn
+    return conn
@@ -0,0 +1,59 @@
+"""
+Mode de réponse en flux (opt-in) pour les recherches.
+
+Chaque section (vols aller, vols retour, hôtels) est envoyée dès que son
+appel amont est terminé, en NDJSON ou en Server-Sent Events, puis un
+événement final "done" récapitule les erreurs.
+
+Activation : `?stream=ndjson` / `?stream=sse`, ou en-tête Accept
+`application/x-ndjson` / `text/event-stream`.
+"""
+
+import json
+from flask import Response, stream_with_context
+
+_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse":    "text/event-stream",
+}
+
+
+def requested_mode(req) -> str | None:
+    """Retourne "ndjson", "sse" ou None (réponse JSON classique)."""
+    mode = (req.args.get("stream") or "").lower()
+    if mode in _MIMETYPES:
+        return mode
+    accept = req.headers.get("Accept", "")
+    if "text/event-stream" in accept:
+        return "sse"
+    if "application/x-ndjson" in accept:
+        return "ndjson"
+    return None
+
+
+def _encode(event: dict, mode: str) -> str:
+    payload = json.dumps(event, ensure_ascii=False)
+    if mode == "sse":
+        return f"event: {event['section']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+def stream_sections(sections, mode: str) -> Response:
+    """
+    `sections` produit (nom, résultat, erreur), cf. common.concurrency.iter_completed.
+    """
+    def generate():
+        errors = {}
+        for name, result, error in sections:
+            if error:
+                errors[name] = error
+                yield _encode({"section": name, "error": error}, mode)
+            else:
+                yield _encode({"section": name, "data": result}, mode)
+        yield _encode({"section": "done", "errors": errors}, mode)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=_MIMETYPES[mode],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,229 @@
+"""
+Client HTTP partagé pour tous les appels RapidAPI.
+
+- une Session keep-alive par hôte, pool dimensionné sur la concurrence du worker ;
+- timeouts de connexion / lecture ;
+- relances bornées avec backoff aléatoire sur 5xx et erreurs réseau ;
+- disjoncteur par hôte : échec immédiat tant que l'amont est considéré en panne ;
+- chaque tentative passe par l'ordonnanceur de quota (common.scheduler) ;
+- `counting()` compte les appels faits dans un contexte (budget du préchargeur).
+
+Les URLs de base sont configurables (.env) pour viser un stub local.
+"""
+
+import contextvars
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from common import metrics
+from common import scheduler as schedulers
+from common.scheduler import QueueTimeout
+
+load_dotenv()
+UPSTREAM_POOL_SIZE       = int(os.getenv("UPSTREAM_POOL_SIZE") or os.getenv("UPSTREAM_WORKERS") or 32)
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT") or 3.05)
+UPSTREAM_READ_TIMEOUT    = float(os.getenv("UPSTREAM_READ_TIMEOUT") or 15)
+UPSTREAM_RETRIES         = int(os.getenv("UPSTREAM_RETRIES") or 2)
+UPSTREAM_BACKOFF         = float(os.getenv("UPSTREAM_BACKOFF") or 0.3)
+BREAKER_THRESHOLD        = int(os.getenv("BREAKER_THRESHOLD") or 5)
+BREAKER_COOLDOWN         = float(os.getenv("BREAKER_COOLDOWN") or 30)
+
+
+class UpstreamError(Exception):
+    """Erreur d'appel amont (réseau, 5xx persistants...)."""
+    code = "upstream_error"
+
+
+class CircuitOpenError(UpstreamError):
+    """Le disjoncteur de l'hôte est ouvert : appel refusé sans contacter l'amont."""
+    code = "unavailable"
+
+
+class RateLimitedError(UpstreamError):
+    """Quota RapidAPI dépassé (429 persistants ou file d'attente saturée)."""
+    code = "rate_limited"
+
+
+class CallCounter:
+    """Appels amont effectivement envoyés (tentatives comprises)."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self):
+        with self._lock:
+            self.value += 1
+
+
+_counter = contextvars.ContextVar("upstream_call_counter", default=None)
+
+
+@contextmanager
+def counting():
+    """Compte les appels amont faits dans ce bloc, y compris dans les tâches qu'il lance."""
+    counter = CallCounter()
+    token   = _counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _counter.reset(token)
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown  = cooldown
+        self.failures  = 0
+        self.opened_at = None
+        self._trial    = False
+        self._lock     = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # Semi-ouvert : un seul appel d'essai après la période de refroidissement
+            if not self._trial and time.monotonic() - self.opened_at >= self.cooldown:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures  = 0
+            self.opened_at = None
+            self._trial    = False
+
+    def cancel_trial(self):
+        """L'appel d'essai n'a pas eu lieu (refusé localement) : un autre pourra le tenter."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+class UpstreamClient:
+    def __init__(
+        self,
+        pool_size: int = UPSTREAM_POOL_SIZE,
+        connect_timeout: float = UPSTREAM_CONNECT_TIMEOUT,
+        read_timeout: float = UPSTREAM_READ_TIMEOUT,
+        retries: int = UPSTREAM_RETRIES,
+        backoff: float = UPSTREAM_BACKOFF,
+    ):
+        self.pool_size = pool_size
+        self.timeout   = (connect_timeout, read_timeout)
+        self.retries   = retries
+        self.backoff   = backoff
+        self._sessions = {}
+        self._breakers = {}
+        self._pid      = os.getpid()
+        self._lock     = threading.Lock()
+
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            # Les workers gunicorn forkent : ne pas partager les sockets du parent
+            if self._pid != os.getpid():
+                self._sessions = {}
+                self._breakers = {}
+                self._pid = os.getpid()
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+            return breaker
+
+    def _sleep_backoff(self, attempt: int):
+        # Backoff exponentiel avec jitter
+        time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def get(self, url: str, headers: dict | None = None, params: dict | None = None) -> requests.Response:
+        """
+        GET avec relances. Retourne la dernière réponse (y compris 4xx / 5xx),
+        lève RateLimitedError sur quota dépassé et UpstreamError si aucune
+        réponse n'a pu être obtenue.
+        """
+        host    = urlsplit(url).netloc
+        session = self._session(host)
+        breaker = self.breaker(host)
+        scheduler = schedulers.for_host(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Amont indisponible : {host}")
+
+        response, error = None, None
+        for attempt in range(self.retries + 1):
+            # Sur 429, c'est la pause de l'ordonnanceur (Retry-After) qui espace les tentatives
+            if attempt and (response is None or response.status_code != 429):
+                self._sleep_backoff(attempt - 1)
+            try:
+                scheduler.acquire()
+            except QueueTimeout as e:
+                breaker.cancel_trial()
+                raise RateLimitedError(str(e)) from e
+            counter = _counter.get()
+            if counter is not None:
+                counter.add()
+            status = None
+            start  = time.perf_counter()
+            try:
+                response = session.get(url, headers=headers, params=params, timeout=self.timeout)
+                status = response.status_code
+            except requests.RequestException as e:
+                # Réseau, délai, réponse tronquée ou mal encodée : échec comptabilisé
+                # pour le disjoncteur (sinon l'appel d'essai resterait bloqué)
+                response, error = None, e
+                continue
+            finally:
+                scheduler.release(status, _retry_after(response) if status == 429 else None)
+                metrics.UPSTREAM_SECONDS.labels(host).observe(time.perf_counter() - start)
+                metrics.UPSTREAM_REQUESTS.labels(host, str(status) if status else "error").inc()
+            if status == 429:
+                continue
+            if status < 500:
+                breaker.record_success()
+                return response
+
+        if response is not None and response.status_code == 429:
+            # L'amont répond : ce n'est pas une panne pour le disjoncteur
+            breaker.record_success()
+            raise RateLimitedError(f"Quota dépassé : {host}")
+        breaker.record_failure()
+        if response is not None:
+            return response
+        raise UpstreamError(f"Échec de l'appel {host} : {error}") from error
+
+
+client = UpstreamClient()
+
+
+def get(url: str, headers: dict | None = None, params: dict | None = None) -> requests.Response:
+    return client.get(url, headers=headers, params=params)
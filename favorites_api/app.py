@@ -0,0 +1,127 @@
+# app.py
+
+import os
+import sys
+import click
+from dotenv import load_dotenv
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+
+# Accès au package partagé `common` (racine du dépôt)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from common import metrics
+from common.log import get_logger
+from favorites import compress_legacy, db, favorite_from_payload, insert_favorites, list_favorites, migrate
+
+# Chargement des variables d'environnement
+load_dotenv()
+
+# Base Supabase (PostgreSQL) en production, SQLite local par défaut
+DATABASE_URL = os.getenv("DATABASE_URL") or f"sqlite:///{os.path.join(ROOT_DIR, 'favorites.sqlite3')}"
+if DATABASE_URL.startswith("postgres://"):
+    # Format Supabase / Heroku, refusé par SQLAlchemy
+    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://"):]
+
+# Pool de connexions par worker (ignoré pour SQLite)
+DB_POOL_SIZE    = int(os.getenv("DB_POOL_SIZE") or 5)
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or 10)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE") or 1800)  # secondes
+
+# Pagination et écritures groupées
+FAVORITES_PAGE_SIZE     = int(os.getenv("FAVORITES_PAGE_SIZE") or 20)
+FAVORITES_MAX_PAGE_SIZE = int(os.getenv("FAVORITES_MAX_PAGE_SIZE") or 100)
+FAVORITES_BULK_MAX      = int(os.getenv("FAVORITES_BULK_MAX") or 500)
+
+app = Flask(__name__)
+origins = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
+CORS(
+    app,
+    resources={r"/api/*": {"origins": origins}},
+    methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    supports_credentials=True
+)
+
+app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
+if not DATABASE_URL.startswith("sqlite"):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_size":     DB_POOL_SIZE,
+        "max_overflow":  DB_MAX_OVERFLOW,
+        "pool_recycle":  DB_POOL_RECYCLE,
+        "pool_pre_ping": True,   # connexions coupées par le pooler Supabase
+    }
+db.init_app(app)
+metrics.init_app(app, "favorites")
+logger = get_logger("favorites_api")
+
+@app.route("/api/favorites", methods=["POST"])
+def api_add_favorite():
+    try:
+        row = favorite_from_payload(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    favorite_id = insert_favorites([row])[0]
+    logger.info("[❤️ API Favoris] Favori %s ajouté pour %s", favorite_id, row["user_id"])
+    return jsonify({"id": favorite_id}), 201
+
+@app.route("/api/favorites/bulk", methods=["POST"])
+def api_add_favorites_bulk():
+    """Enregistre plusieurs favoris en une seule requête SQL : {"favorites": [...]}."""
+    items = (request.get_json(silent=True) or {}).get("favorites")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Requête vide"}), 400
+    if len(items) > FAVORITES_BULK_MAX:
+        return jsonify({"error": f"{FAVORITES_BULK_MAX} favoris maximum par lot"}), 400
+
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            rows.append(favorite_from_payload(item))
+        except ValueError as e:
+            return jsonify({"error": str(e), "index": index}), 400
+
+    ids = insert_favorites(rows)
+    logger.info("[❤️ API Favoris] %s favori(s) ajouté(s)", len(ids))
+    return jsonify({"ids": ids}), 201
+
+@app.route("/api/favorites/<user_id>", methods=["GET"])
+def api_get_favorites(user_id):
+    """
+    Favoris d'un utilisateur, du plus récent au plus ancien, par pages :
+    ?limit=20, puis ?cursor=<next_cursor> de la réponse précédente.
+    """
+    try:
+        limit = int(request.args.get("limit", FAVORITES_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit invalide"}), 400
+    limit = min(max(limit, 1), FAVORITES_MAX_PAGE_SIZE)
+
+    try:
+        favorites, next_cursor = list_favorites(user_id, limit, request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    with metrics.span("serialize"):
+        return jsonify({
+            "favorites":   [f.to_dict() for f in favorites],
+            "next_cursor": next_cursor,
+        }), 200
+
+@app.cli.command("init-db")
+def init_db():
+    """Crée la table `favorites`, ou ajoute à une table existante les colonnes compressées et l'index."""
+    changes = migrate()
+    click.echo(f"[🗃️ Base favoris] {', '.join(changes) or 'déjà à jour'} "
+               f"({db.engine.url.render_as_string(hide_password=True)})")
+
+@app.cli.command("compress-favorites")
+@click.option("--batch-size", default=500, show_default=True, help="Favoris recopiés par transaction.")
+def compress_favorites(batch_size):
+    """Recopie flights / hotels des anciennes lignes dans les colonnes compressées."""
+    click.echo(f"[🗃️ Base favoris] {compress_legacy(batch_size)} favori(s) recopié(s)")
+
+if __name__ == "__main__":
+    app.run(port=5002, debug=False)
@@ -0,0 +1,205 @@
+import base64
+import json
+import os
+import zlib
+from datetime import date, datetime, timezone
+from dotenv import load_dotenv
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Index, and_, insert, inspect, or_, select, text, update
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# Chargement des variables d'environnement
+load_dotenv()
+FAVORITES_COMPRESSION_LEVEL = int(os.getenv("FAVORITES_COMPRESSION_LEVEL") or 6)
+
+# Limites des champs texte (colonnes VARCHAR)
+USER_ID_MAX_LENGTH     = 64
+DESTINATION_MAX_LENGTH = 255
+
+db = SQLAlchemy()
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON compressé (zlib) : les listes d'offres vols / hôtels sont très
+    répétitives (mêmes clés, mêmes compagnies, URLs proches).
+    """
+    impl     = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return zlib.compress(raw, FAVORITES_COMPRESSION_LEVEL)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value))
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class Favorite(db.Model):
+    __tablename__ = "favorites"
+
+    id           = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    user_id      = db.Column(db.String(USER_ID_MAX_LENGTH), nullable=False)
+    destination  = db.Column(db.String(DESTINATION_MAX_LENGTH))
+    start_date   = db.Column(db.Date)
+    end_date     = db.Column(db.Date)
+    itinerary    = db.Column(db.JSON)
+    # Colonnes JSON d'origine (table Supabase existante) : lues pour les
+    # anciennes lignes, plus écrites ; cf. migrate() / compress_legacy()
+    flights      = db.Column(db.JSON)
+    hotels       = db.Column(db.JSON)
+    flights_zlib = db.Column(CompressedJSON)
+    hotels_zlib  = db.Column(CompressedJSON)
+    created_at   = db.Column(db.DateTime, nullable=False, default=_utcnow)
+
+    # Sert la pagination par utilisateur, du plus récent au plus ancien
+    __table_args__ = (Index("ix_favorites_user_created", "user_id", "created_at", "id"),)
+
+    def to_dict(self) -> dict:
+        return {
+            "id":          self.id,
+            "user_id":     self.user_id,
+            "destination": self.destination,
+            "start_date":  self.start_date.isoformat() if self.start_date else None,
+            "end_date":    self.end_date.isoformat() if self.end_date else None,
+            "itinerary":   self.itinerary,
+            "flights":     (self.flights_zlib if self.flights_zlib is not None else self.flights) or [],
+            "hotels":      (self.hotels_zlib if self.hotels_zlib is not None else self.hotels) or [],
+            "created_at":  self.created_at.isoformat() if self.created_at else None,
+        }
+
+def _parse_date(value):
+    return date.fromisoformat(value) if value else None
+
+def favorite_from_payload(data: dict) -> dict:
+    """Colonnes d'un favori à partir du payload JSON ; ValueError si invalide."""
+    if not isinstance(data, dict) or not data.get("user_id"):
+        raise ValueError("user_id manquant")
+    user_id = data["user_id"]
+    if isinstance(user_id, bool) or not isinstance(user_id, (str, int)) or len(str(user_id)) > USER_ID_MAX_LENGTH:
+        raise ValueError(f"user_id invalide ({USER_ID_MAX_LENGTH} caractères max)")
+    destination = data.get("destination")
+    if destination is not None and (not isinstance(destination, str) or len(destination) > DESTINATION_MAX_LENGTH):
+        raise ValueError(f"destination invalide ({DESTINATION_MAX_LENGTH} caractères max)")
+    try:
+        start_date = _parse_date(data.get("start_date"))
+        end_date   = _parse_date(data.get("end_date"))
+    except (TypeError, ValueError):
+        raise ValueError("Dates invalides")
+    itinerary = data.get("itinerary")
+    if itinerary is not None and not isinstance(itinerary, (dict, list)):
+        raise ValueError("itinerary invalide")
+    offers = {}
+    for field in ("flights", "hotels"):
+        value = data.get(field) or []
+        if not isinstance(value, list):
+            raise ValueError(f"{field} doit être une liste")
+        offers[field] = value
+    return {
+        "user_id":      str(user_id),
+        "destination":  destination,
+        "start_date":   start_date,
+        "end_date":     end_date,
+        "itinerary":    itinerary,
+        "flights_zlib": offers["flights"],
+        "hotels_zlib":  offers["hotels"],
+    }
+
+def encode_cursor(favorite: Favorite) -> str:
+    raw = f"{favorite.created_at.isoformat()}|{favorite.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """(created_at, id) du dernier favori de la page précédente ; ValueError si invalide."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, favorite_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(favorite_id)
+    except (UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("Curseur invalide")
+
+def list_favorites(user_id: str, limit: int, cursor: str | None = None) -> tuple[list[Favorite], str | None]:
+    """
+    Page de favoris d'un utilisateur, du plus récent au plus ancien.
+    Pagination par clé (created_at, id) : le coût ne dépend pas de la page,
+    contrairement à un OFFSET. Retourne (favoris, curseur suivant ou None).
+    """
+    query = select(Favorite).where(Favorite.user_id == user_id)
+    if cursor:
+        created_at, favorite_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Favorite.created_at < created_at,
+            and_(Favorite.created_at == created_at, Favorite.id < favorite_id),
+        ))
+    query = query.order_by(Favorite.created_at.desc(), Favorite.id.desc()).limit(limit + 1)
+
+    favorites = db.session.scalars(query).all()
+    if len(favorites) > limit:
+        favorites = favorites[:limit]
+        return favorites, encode_cursor(favorites[-1])
+    return favorites, None
+
+def insert_favorites(rows: list[dict]) -> list[int]:
+    """Insère plusieurs favoris en une requête groupée ; retourne leurs id dans l'ordre."""
+    ids = db.session.scalars(
+        insert(Favorite).returning(Favorite.id, sort_by_parameter_order=True),
+        rows,
+    ).all()
+    db.session.commit()
+    return list(ids)
+
+def migrate() -> list[str]:
+    """
+    Crée la table, ou complète une table `favorites` existante (Supabase) :
+    colonnes compressées et index de pagination. Idempotent ; retourne les
+    changements appliqués.
+    """
+    engine = db.engine
+    if not inspect(engine).has_table(Favorite.__tablename__):
+        db.create_all()
+        return ["table favorites"]
+
+    changes  = []
+    existing = {column["name"] for column in inspect(engine).get_columns(Favorite.__tablename__)}
+    with engine.begin() as conn:
+        for name in ("flights_zlib", "hotels_zlib"):
+            if name not in existing:
+                column_type = Favorite.__table__.c[name].type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {Favorite.__tablename__} ADD COLUMN {name} {column_type}"))
+                changes.append(f"colonne {name}")
+    indexes = {index["name"] for index in inspect(engine).get_indexes(Favorite.__tablename__)}
+    for index in Favorite.__table__.indexes:
+        if index.name not in indexes:
+            index.create(engine)
+            changes.append(f"index {index.name}")
+    return changes
+
+def compress_legacy(batch_size: int = 500) -> int:
+    """
+    Recopie le JSON des anciennes colonnes flights / hotels dans les colonnes
+    compressées, par lots (clé id croissante). Les anciennes colonnes sont
+    conservées : à supprimer à la main une fois la copie vérifiée.
+    """
+    copied, last_id = 0, None
+    while True:
+        query = select(Favorite).where(
+            Favorite.flights_zlib.is_(None), Favorite.hotels_zlib.is_(None),
+            or_(Favorite.flights.is_not(None), Favorite.hotels.is_not(None)),
+        )
+        if last_id is not None:
+            query = query.where(Favorite.id > last_id)
+        favorites = db.session.scalars(query.order_by(Favorite.id).limit(batch_size)).all()
+        if not favorites:
+            return copied
+        db.session.execute(update(Favorite), [
+            {"id": f.id, "flights_zlib": f.flights or [], "hotels_zlib": f.hotels or []}
+            for f in favorites
+        ])
+        db.session.commit()
+        copied += len(favorites)
+        last_id = favorites[-1].id
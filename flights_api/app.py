@@ -1,22 +1,63 @@
 import os
+import sys
+import click
+from datetime import date, timedelta
 from dotenv import load_dotenv
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from flights import get_airport_code, search_flights
-from utils import format_flight_info
+
+# Accès au package partagé `common` (racine du dépôt)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import geo_index, metrics, scheduler, streaming
+from common.concurrency import Deadline, iter_completed, run_concurrently
+from common.log import get_logger
+from common.prefetch import Prefetcher, is_upcoming
+from flights import CABIN_MAP, get_airport_code, search_flights, search_cache, _fetch_airport_code
+from offers import cheapest_price, filters_from_payload
+from utils import format_flights
 
 # Chargement des variables d'environnement
 load_dotenv()
 
+# Échéance globale d'une recherche (secondes)
+FLIGHTS_DEADLINE = float(os.getenv("FLIGHTS_DEADLINE") or 20)
+
+# Recherche calendrier : ± jours max, appels simultanés max, échéance (secondes)
+CALENDAR_MAX_WINDOW  = int(os.getenv("CALENDAR_MAX_WINDOW") or 3)
+CALENDAR_CONCURRENCY = int(os.getenv("CALENDAR_CONCURRENCY") or 4)
+CALENDAR_DEADLINE    = float(os.getenv("CALENDAR_DEADLINE") or 30)
+
 app = Flask(__name__)
 # Lecture des origines CORS depuis .env
 origins = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
 CORS(app, resources={r"/api/*": {"origins": origins}})
+metrics.init_app(app, "flights")
+logger = get_logger("flights_api")
+
+def _resolve_airports(from_city, to_city, deadline):
+    """
+    Obtient les deux codes d’aéroports en parallèle.
+    Retourne ((from_code, to_code), None) ou (None, réponse d'erreur).
+    """
+    codes, errors = run_concurrently({
+        "from": lambda: get_airport_code(from_city),
+        "to":   lambda: get_airport_code(to_city),
+    }, deadline)
+    if "timeout" in errors.values():
+        return None, (jsonify({"error": "Délai dépassé pour les codes d’aéroport"}), 504)
+    if errors:
+        return None, (jsonify({"error": "Service de vols temporairement indisponible", "errors": errors}), 503)
+    from_code = codes.get("from")
+    to_code   = codes.get("to")
+    if not from_code or not to_code:
+        return None, (jsonify({"error": "Impossible de récupérer les codes d’aéroport"}), 400)
+    return (from_code, to_code), None
 
 @app.route("/api/flights", methods=["POST"])
 def api_flights():
     data = request.get_json()
-    print("[📥 API Flights] Données reçues:", data)
+    logger.info("[📥 API Flights] Données reçues: %s", data)
 
     from_city   = data.get("from")
     to_city     = data.get("to")
@@ -27,35 +68,176 @@ def api_flights():
     total_passengers = adults + children
 
     # Classe de cabine par défaut
-    cabin_map = {
-        "Économique":     "ECONOMY",
-        "Modéré":         "PREMIUM_ECONOMY",
-        "Luxe":           "FIRST"
+    cabin_class = CABIN_MAP.get(data.get("budget", "Économique"), "ECONOMY")
+    filters     = filters_from_payload(data)
+
+    deadline = Deadline(FLIGHTS_DEADLINE)
+
+    codes, error = _resolve_airports(from_city, to_city, deadline)
+    if error:
+        return error
+    from_code, to_code = codes
+
+    # Appels API aller / retour en parallèle, filtrés puis formatés (max 5) dès réception
+    legs = {
+        "outbound": lambda: format_flights(
+            search_flights(from_code, to_code, depart_date, adults, children, cabin_class),
+            total_passengers, adults, children, cabin_class, return_date, **filters),
+        "return":   lambda: format_flights(
+            search_flights(to_code, from_code, return_date, adults, children, cabin_class),
+            total_passengers, adults, children, cabin_class, depart_date, **filters),
     }
-    cabin_class = cabin_map.get(data.get("budget", "Économique"), "ECONOMY")
 
-    # Obtenir les codes d’aéroports
+    stream_mode = streaming.requested_mode(request)
+    if stream_mode:
+        return streaming.stream_sections(iter_completed(legs, deadline), stream_mode)
+
+    sections, errors = run_concurrently(legs, deadline)
+    outbound = sections.get("outbound", [])
+    retour   = sections.get("return", [])
+
+    logger.info("[✅ API Flights] Vols aller: %s | Vols retour: %s", len(outbound), len(retour))
+    response = {"outbound": outbound, "return": retour}
+    if errors:
+        # Résultat partiel : une jambe a échoué ou dépassé l'échéance
+        response["errors"] = errors
+    with metrics.span("serialize"):
+        return jsonify(response)
+
+def _date_window(center, window):
+    """Dates ISO de center - window à center + window, sans les jours passés."""
+    day   = date.fromisoformat(center)
+    today = date.today()
+    days  = (day + timedelta(days=offset) for offset in range(-window, window + 1))
+    return [d.isoformat() for d in days if d >= today]
+
+@app.route("/api/flights/calendar", methods=["POST"])
+def api_flights_calendar():
+    """
+    Dates flexibles : prix le plus bas par jour autour des dates demandées
+    et matrice aller x retour (prix total pour tous les passagers).
+    """
+    data = request.get_json()
+    logger.info("[📥 API Flights Calendar] Données reçues: %s", data)
+
+    if not data:
+        return jsonify({"error": "Requête vide"}), 400
+
+    from_city   = data.get("from")
+    to_city     = data.get("to")
+    cabin_class = CABIN_MAP.get(data.get("budget", "Économique"), "ECONOMY")
+
+    try:
+        adults   = int(data.get("adults", 1))
+        children = int(data.get("children", 0))
+        window   = min(max(int(data.get("window", CALENDAR_MAX_WINDOW)), 0), CALENDAR_MAX_WINDOW)
+        outbound_dates = _date_window(data.get("depart_date"), window)
+        return_dates   = _date_window(data["return_date"], window) if data.get("return_date") else []
+    except (TypeError, ValueError):
+        return jsonify({"error": "Dates, passagers ou fenêtre invalides"}), 400
+    total_passengers = adults + children
+
+    deadline = Deadline(CALENDAR_DEADLINE)
+    codes, error = _resolve_airports(from_city, to_city, deadline)
+    if error:
+        return error
+    from_code, to_code = codes
+
+    # Un appel par jour (servi par le cache si déjà demandé), concurrence bornée
+    tasks = {}
+    for day in outbound_dates:
+        tasks[f"outbound:{day}"] = lambda day=day: cheapest_price(
+            search_flights(from_code, to_code, day, adults, children, cabin_class))
+    for day in return_dates:
+        tasks[f"return:{day}"] = lambda day=day: cheapest_price(
+            search_flights(to_code, from_code, day, adults, children, cabin_class))
+    prices, errors = run_concurrently(tasks, deadline, CALENDAR_CONCURRENCY)
+
+    def total(unit_price):
+        return round(unit_price * total_passengers, 2) if unit_price is not None else None
+
+    outbound = {day: total(prices.get(f"outbound:{day}")) for day in outbound_dates}
+    retour   = {day: total(prices.get(f"return:{day}")) for day in return_dates}
+    matrix = [
+        [
+            round(outbound[out_day] + retour[ret_day], 2)
+            if outbound[out_day] is not None and retour[ret_day] is not None and ret_day >= out_day
+            else None
+            for ret_day in return_dates
+        ]
+        for out_day in outbound_dates
+    ]
+
+    cheapest = None
+    for i, out_day in enumerate(outbound_dates):
+        if not return_dates:
+            candidates = [(outbound[out_day], None)]
+        else:
+            candidates = [(matrix[i][j], ret_day) for j, ret_day in enumerate(return_dates)]
+        for price, ret_day in candidates:
+            if price is not None and (cheapest is None or price < cheapest["price"]):
+                cheapest = {"depart_date": out_day, "return_date": ret_day, "price": price}
+
+    response = {
+        "outbound_dates": outbound_dates,
+        "return_dates":   return_dates,
+        "outbound":       outbound,
+        "return":         retour,
+        "matrix":         matrix,
+        "cheapest":       cheapest,
+        "currency":       "EUR",
+    }
+    if errors:
+        response["errors"] = errors
+    with metrics.span("serialize"):
+        return jsonify(response)
+
+def _prefetch_key(data):
+    """Clé de préchargement d'un payload /api/flights (villes normalisées + dates)."""
+    if not is_upcoming(data.get("depart_date")):
+        return None
+    return (
+        geo_index.normalize_city(data.get("from")),
+        geo_index.normalize_city(data.get("to")),
+        data.get("depart_date"),
+        data.get("return_date"),
+        int(data.get("adults", 1)),
+        int(data.get("children", 0)),
+        CABIN_MAP.get(data.get("budget", "Économique"), "ECONOMY"),
+    )
+
+def _prefetch_warm(key):
+    from_city, to_city, depart_date, return_date, adults, children, cabin_class = key
     from_code = get_airport_code(from_city)
     to_code   = get_airport_code(to_city)
     if not from_code or not to_code:
-        return jsonify({"error": "Impossible de récupérer les codes d’aéroport"}), 400
+        return
+    search_flights(from_code, to_code, depart_date, adults, children, cabin_class)
+    if return_date:
+        search_flights(to_code, from_code, return_date, adults, children, cabin_class)
 
-    # Appels API
-    outbound_raw = search_flights(from_code, to_code, depart_date, adults, children, cabin_class)
-    return_raw   = search_flights(to_code, from_code, return_date, adults, children, cabin_class)
+prefetcher = Prefetcher("flights", "/api/flights", _prefetch_key, _prefetch_warm)
+app.before_request(prefetcher.ensure_started)
 
-    # Formatage des vols (max 5)
-    outbound = [
-        format_flight_info(f, total_passengers, adults, children, cabin_class, return_date)
-        for f in outbound_raw[:5]
-    ]
-    retour = [
-        format_flight_info(f, total_passengers, adults, children, cabin_class, depart_date)
-        for f in return_raw[:5]
-    ]
+@app.route("/api/cache/stats", methods=["GET"])
+def api_cache_stats():
+    """Compteurs du cache de recherche (hits / misses / évictions...)."""
+    return jsonify({"flights": search_cache.stats()})
+
+@app.route("/api/scheduler/stats", methods=["GET"])
+def api_scheduler_stats():
+    """État des ordonnanceurs amont par hôte (concurrence, file d'attente, 429)."""
+    return jsonify(scheduler.stats())
 
-    print(f"[✅ API Flights] Vols aller: {len(outbound)} | Vols retour: {len(retour)}")
-    return jsonify({"outbound": outbound, "return": retour})
+@app.cli.command("warm-geo")
+@click.argument("cities", nargs=-1)
+@click.option("--file", "cities_file", type=click.File("r", encoding="utf-8"), help="Une ville par ligne.")
+@click.option("--force", is_flag=True, help="Rafraîchit même les entrées encore valides.")
+def warm_geo(cities, cities_file, force):
+    """Pré-remplit l'index local des codes aéroport."""
+    cities = list(cities) + ([line.strip() for line in cities_file] if cities_file else [])
+    stats = geo_index.warm("airport", cities, _fetch_airport_code, force=force)
+    click.echo(f"[🔥 Warm-up aéroports] {stats}")
 
 if __name__ == "__main__":
     # Désactiver debug en production !
@@ -1,21 +1,43 @@
 import os
 from dotenv import load_dotenv
-import requests
+from common import geo_index, metrics, upstream
+from common.cache import SearchCache
+from common.log import get_logger
 
 # Chargement de la clé et du host depuis .env
 load_dotenv()
 RAPIDAPI_KEY   = os.getenv("RAPIDAPI_KEY")
 RAPIDAPI_HOST  = os.getenv("RAPIDAPI_HOST_FLIGHTS")
+BASE_URL       = os.getenv("RAPIDAPI_BASE_URL_FLIGHTS") or "https://booking-com15.p.rapidapi.com"
 
 HEADERS = {
     "x-rapidapi-key": RAPIDAPI_KEY,
     "x-rapidapi-host": RAPIDAPI_HOST
 }
 
+# Classe de cabine par niveau de budget
+CABIN_MAP = {
+    "Économique":     "ECONOMY",
+    "Modéré":         "PREMIUM_ECONOMY",
+    "Luxe":           "FIRST"
+}
+
+logger = get_logger("flights")
+
+# Offres brutes par paramètres de recherche (le filtrage budget se fait en aval)
+search_cache = SearchCache("flights")
+
 def get_airport_code(city_name):
-    url = "https://booking-com15.p.rapidapi.com/api/v1/flights/searchDestination"
+    """Code aéroport d'une ville, via l'index local partagé (common.geo_index)."""
+    with metrics.span("resolve_airport"):
+        return geo_index.resolve("airport", city_name, _fetch_airport_code)
+
+def _fetch_airport_code(city_name):
+    url = f"{BASE_URL}/api/v1/flights/searchDestination"
     params = {"query": city_name}
-    response = requests.get(url, headers=HEADERS, params=params)
+    response = upstream.get(url, headers=HEADERS, params=params)
+    # Une erreur amont ne doit pas être mise en cache comme « ville inconnue »
+    response.raise_for_status()
     data = response.json()
     for result in data.get("data", []):
         if result["id"].endswith(".AIRPORT"):
@@ -23,7 +45,7 @@ def get_airport_code(city_name):
     return None
 
 def search_flights(from_id, to_id, date, adults=1, children=0, cabin_class="ECONOMY", sort="BEST"):
-    url = "https://booking-com15.p.rapidapi.com/api/v1/flights/searchFlights"
+    url = f"{BASE_URL}/api/v1/flights/searchFlights"
     params = {
         "fromId": from_id,
         "toId": to_id,
@@ -41,29 +63,24 @@ def search_flights(from_id, to_id, date, adults=1, children=0, cabin_class="ECON
     params = {k: v for k, v in params.items() if v is not None}
 
     try:
-        res = requests.get(url, headers=HEADERS, params=params)
-        if res.status_code != 200:
-            print("[DEBUG] Échec API vols:", res.status_code, res.text)
-            return []
-        data = res.json()
-        flights = data.get("data", {}).get("flightOffers", [])
-        print("[DEBUG] Nombre de vols récupérés:", len(flights))
-        return flights
+        with metrics.span("search_flights"):
+            return search_cache.get_or_load(
+                tuple(sorted(params.items())),
+                lambda: _fetch_flights(url, params),
+            )
+    except (upstream.RateLimitedError, upstream.CircuitOpenError):
+        # Quota / panne amont : à signaler, pas à confondre avec « aucun vol »
+        raise
     except Exception as e:
-        print("[ERREUR FLASK flights.py]", e)
+        logger.error("[ERREUR FLASK flights.py] %s", e)
         return []
 
-def filter_by_max_price(flights, max_price):
-    return [
-        flight for flight in flights
-        if flight.get("price", 999999) <= max_price
-    ]
-
-def filter_by_budget(flights, budget_level):
-    thresholds = {
-        "Économique": 250,
-        "Modéré":     600,
-        "Luxe":       1200,
-    }
-    max_price = thresholds.get(budget_level, 600)
-    return filter_by_max_price(flights, max_price)
+def _fetch_flights(url, params):
+    res = upstream.get(url, headers=HEADERS, params=params)
+    if res.status_code != 200:
+        logger.debug("[DEBUG] Échec API vols: %s %s", res.status_code, res.text)
+        raise upstream.UpstreamError(f"API vols: HTTP {res.status_code}")
+    data = res.json()
+    flights = data.get("data", {}).get("flightOffers", [])
+    logger.debug("[DEBUG] Nombre de vols récupérés: %s", len(flights))
+    return flights
@@ -0,0 +1,115 @@
+"""
+Pipeline de traitement des offres de vol (flightOffers Booking).
+
+Chaque offre brute est lue une seule fois dans un enregistrement compact
+(FlightOffer), filtrée (prix max, niveau de budget, escales) puis seules les
+k meilleures sont retenues (tas plutôt que tri complet) avant formatage.
+"""
+
+import heapq
+from itertools import islice
+from operator import attrgetter
+
+# Prix max par passager (€) selon le niveau de budget
+BUDGET_THRESHOLDS = {
+    "Économique": 250,
+    "Modéré":     600,
+    "Luxe":       1200,
+}
+
+SORT_KEYS = {
+    "price":    attrgetter("price"),
+    "duration": attrgetter("duration"),
+}
+
+
+def offer_price(flight):
+    """Prix unitaire (par passager) d'une offre, depuis unifiedPriceBreakdown."""
+    price_info = flight.get("unifiedPriceBreakdown", {}).get("price", {})
+    return price_info.get("units", 0) + price_info.get("nanos", 0) / 1e9
+
+
+def cheapest_price(flights):
+    """Prix unitaire le plus bas parmi les offres qui en ont un, sinon None."""
+    prices = [
+        offer_price(f) for f in flights
+        if f.get("unifiedPriceBreakdown", {}).get("price")
+    ]
+    return min(prices) if prices else None
+
+
+class FlightOffer:
+    __slots__ = (
+        "price", "currency", "departure_time", "arrival_time", "duration", "stops",
+        "airline", "logo", "departure_city", "arrival_city", "origin_code", "dest_code",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+
+def parse_offer(flight):
+    """Enregistrement compact d'une offre brute, ou None si elle n'a pas de segments."""
+    segments = flight.get("segments", [])
+    if not segments:
+        return None
+
+    first_leg = segments[0].get("legs", [{}])[0]
+    last_leg  = segments[-1].get("legs", [{}])[-1]
+    carriers  = first_leg.get("carriersData", [])
+    carrier   = carriers[0] if carriers else {}
+
+    return FlightOffer(
+        price          = offer_price(flight),
+        currency       = flight.get("unifiedPriceBreakdown", {}).get("price", {}).get("currencyCode", "EUR"),
+        departure_time = first_leg.get("departureTime", ""),
+        arrival_time   = last_leg.get("arrivalTime", ""),
+        duration       = sum(seg.get("totalTime", 0) for seg in segments),
+        stops          = max(len(seg.get("legs", [])) - 1 for seg in segments),
+        airline        = carrier.get("name", "Compagnie inconnue"),
+        logo           = carrier.get("logo", ""),
+        departure_city = first_leg.get("departureAirport", {}).get("cityName", "Inconnu"),
+        arrival_city   = last_leg.get("arrivalAirport", {}).get("cityName", "Inconnu"),
+        origin_code    = first_leg.get("departureAirport", {}).get("code", "").lower(),
+        dest_code      = last_leg.get("arrivalAirport", {}).get("code", "").lower(),
+    )
+
+
+def select_offers(flights, total_passengers=1, max_price=None, budget_level=None, max_stops=None, sort=None, k=5):
+    """
+    Parse, filtre et retient au plus `k` offres.
+      - max_price    : prix total (tous passagers) maximum
+      - budget_level : "Économique" / "Modéré" / "Luxe" (prix max par passager)
+      - max_stops    : nombre d'escales maximum
+      - sort         : "price" / "duration", sinon l'ordre amont est conservé
+    """
+    offers = (offer for offer in map(parse_offer, flights) if offer is not None)
+    if max_price is not None:
+        offers = (o for o in offers if o.price * total_passengers <= max_price)
+    if budget_level in BUDGET_THRESHOLDS:
+        threshold = BUDGET_THRESHOLDS[budget_level]
+        offers = (o for o in offers if o.price <= threshold)
+    if max_stops is not None:
+        offers = (o for o in offers if o.stops <= max_stops)
+
+    if sort in SORT_KEYS:
+        return heapq.nsmallest(k, offers, key=SORT_KEYS[sort])
+    # Ordre amont ("BEST") : on s'arrête dès k offres retenues
+    return list(islice(offers, k))
+
+
+def filters_from_payload(data):
+    """Filtres d'offres lus dans un payload /api/flights (ou /api/trip)."""
+    filters = {"sort": data.get("sort"), "budget_level": data.get("budgetLevel")}
+    if data.get("useCustomBudget") and data.get("budgetFlights"):
+        try:
+            filters["max_price"] = float(data["budgetFlights"])
+        except (TypeError, ValueError):
+            pass
+    if data.get("maxStops") is not None:
+        try:
+            filters["max_stops"] = int(data["maxStops"])
+        except (TypeError, ValueError):
+            pass
+    return filters
@@ -0,0 +1,37 @@
+"""
+Configuration gunicorn commune aux services, à lancer depuis le dossier du service :
+
+    cd flights_api && gunicorn -c ../gunicorn.conf.py -b :5000 app:app
+
+WORKER_MODE=sync (défaut) : workers synchrones, GUNICORN_THREADS threads chacun.
+
+WORKER_MODE=async : workers gevent. Le worker rend les sockets, verrous et
+threads coopératifs (monkey-patching) avant de charger l'application : les
+appels `requests` de flights.py / hotel_api.py cèdent la main pendant
+l'attente de RapidAPI, et les pools de `common` (fan-out, rafraîchissements,
+ordonnanceur) tournent en greenlets. Un worker garde ainsi jusqu'à
+GUNICORN_WORKER_CONNECTIONS recherches en vol, sans changer les vues ni les
+contrats JSON. Ne pas activer `preload_app` dans ce mode : l'application doit
+être importée après le patch.
+"""
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+WORKER_MODE = (os.getenv("WORKER_MODE") or "sync").lower()
+
+workers = int(os.getenv("GUNICORN_WORKERS") or 2)
+
+if WORKER_MODE == "async":
+    worker_class       = "gevent"
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS") or 500)
+    # Fan-out, pool de connexions amont et appels en vol par hôte à la mesure
+    # des requêtes en vol (lus à l'import de common.concurrency,
+    # common.upstream et common.scheduler, dans le worker)
+    for key in ("UPSTREAM_WORKERS", "SCHEDULER_MAX_CONCURRENCY"):
+        if not os.getenv(key):
+            os.environ[key] = str(worker_connections)
+else:
+    worker_class = "sync"
+    threads      = int(os.getenv("GUNICORN_THREADS") or 1)
@@ -1,14 +1,28 @@
 # app.py
 
 import os
+import sys
+import click
 from dotenv import load_dotenv
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from hotel_api import get_destination_id, search_hotels
+
+# Accès au package partagé `common` (racine du dépôt)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import geo_index, metrics, scheduler, streaming
+from common.concurrency import Deadline, iter_completed
+from common.log import get_logger
+from common.upstream import UpstreamError
+from common.prefetch import Prefetcher, is_upcoming
+from hotel_api import get_destination_id, search_hotels, search_cache, _fetch_destination_id
 
 # Chargement des variables d'environnement
 load_dotenv()
 
+# Échéance d'une recherche en mode flux (secondes)
+HOTELS_DEADLINE = float(os.getenv("HOTELS_DEADLINE") or 20)
+
 app = Flask(__name__)
 
 # Origines CORS depuis .env (on peut restreindre ici plus finement)
@@ -22,11 +36,13 @@ CORS(
     allow_headers=["Content-Type", "Authorization"],
     supports_credentials=True
 )
+metrics.init_app(app, "hotels")
+logger = get_logger("hotels_api")
 
 @app.route("/api/hotels", methods=["POST"])
 def api_hotels():
     data = request.get_json()
-    print("\n[📥 API Hôtel] Données reçues:", data)
+    logger.info("[📥 API Hôtel] Données reçues: %s", data)
 
     if not data:
         return jsonify({"error": "Requête vide"}), 400
@@ -46,25 +62,81 @@ def api_hotels():
     if not city or not checkin_date or not checkout_date:
         return jsonify({"error": "Champs manquants"}), 400
 
-    dest_id = get_destination_id(city)
-    if not dest_id:
-        return jsonify({"error": "Destination introuvable"}), 400
-
-    print(f"[🔍 API Hôtel] Recherche d'hôtels à {city} (id {dest_id}) du {checkin_date} au {checkout_date}")
-
-    hotels = search_hotels(
-        dest_id=dest_id,
-        checkin_date=checkin_date,
-        checkout_date=checkout_date,
-        adults=adults,
-        children=children,
-        budget_max=budget_max if use_custom else None
-    )
+    try:
+        dest_id = get_destination_id(city)
+        if not dest_id:
+            return jsonify({"error": "Destination introuvable"}), 400
+
+        logger.info("[🔍 API Hôtel] Recherche d'hôtels à %s (id %s) du %s au %s", city, dest_id, checkin_date, checkout_date)
+
+        stream_mode = streaming.requested_mode(request)
+        if stream_mode:
+            sections = iter_completed({
+                "hotels": lambda: search_hotels(
+                    dest_id, checkin_date, checkout_date, adults, children,
+                    budget_max=budget_max if use_custom else None),
+            }, Deadline(HOTELS_DEADLINE))
+            return streaming.stream_sections(sections, stream_mode)
+
+        hotels = search_hotels(
+            dest_id=dest_id,
+            checkin_date=checkin_date,
+            checkout_date=checkout_date,
+            adults=adults,
+            children=children,
+            budget_max=budget_max if use_custom else None
+        )
+    except UpstreamError as e:
+        logger.error("[Erreur API Hôtel] %s", e)
+        return jsonify({"error": "Service hôtels temporairement indisponible", "code": e.code}), 503
 
     if not hotels:
         return jsonify({"hotels": [], "message": "Aucun hôtel trouvé"}), 200
 
-    return jsonify({"hotels": hotels}), 200
+    with metrics.span("serialize"):
+        return jsonify({"hotels": hotels}), 200
+
+def _prefetch_key(data):
+    """Clé de préchargement d'un payload /api/hotels (ville normalisée + dates)."""
+    if not is_upcoming(data.get("startDate")) or not data.get("endDate"):
+        return None
+    return (
+        geo_index.normalize_city(data.get("destination")),
+        data.get("startDate"),
+        data.get("endDate"),
+        int(data.get("adults", 1)),
+        int(data.get("children", 0)),
+    )
+
+def _prefetch_warm(key):
+    city, checkin_date, checkout_date, adults, children = key
+    dest_id = get_destination_id(city)
+    if dest_id:
+        # Sans budget : le cache garde les résultats bruts, filtrés à la demande
+        search_hotels(dest_id, checkin_date, checkout_date, adults, children)
+
+prefetcher = Prefetcher("hotels", "/api/hotels", _prefetch_key, _prefetch_warm)
+app.before_request(prefetcher.ensure_started)
+
+@app.route("/api/cache/stats", methods=["GET"])
+def api_cache_stats():
+    """Compteurs du cache de recherche (hits / misses / évictions...)."""
+    return jsonify({"hotels": search_cache.stats()})
+
+@app.route("/api/scheduler/stats", methods=["GET"])
+def api_scheduler_stats():
+    """État des ordonnanceurs amont par hôte (concurrence, file d'attente, 429)."""
+    return jsonify(scheduler.stats())
+
+@app.cli.command("warm-geo")
+@click.argument("cities", nargs=-1)
+@click.option("--file", "cities_file", type=click.File("r", encoding="utf-8"), help="Une ville par ligne.")
+@click.option("--force", is_flag=True, help="Rafraîchit même les entrées encore valides.")
+def warm_geo(cities, cities_file, force):
+    """Pré-remplit l'index local des destinations Booking."""
+    cities = list(cities) + ([line.strip() for line in cities_file] if cities_file else [])
+    stats = geo_index.warm("hotel_dest", cities, _fetch_destination_id, force=force)
+    click.echo(f"[🔥 Warm-up destinations] {stats}")
 
 if __name__ == "__main__":
     app.run(port=5001, debug=False)
@@ -1,19 +1,40 @@
 import os
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
+from common import geo_index, metrics, upstream
+from common.cache import SearchCache
+from common.concurrency import UPSTREAM_WORKERS, Deadline, run_concurrently
+from common.log import get_logger
 
 # Chargement des variables d'environnement
 load_dotenv()
 RAPIDAPI_KEY         = os.getenv("RAPIDAPI_KEY")
 RAPIDAPI_HOST_HOTELS = os.getenv("RAPIDAPI_HOST_HOTELS")
+BASE_URL             = os.getenv("RAPIDAPI_BASE_URL_HOTELS") or "https://booking-com.p.rapidapi.com"
 
 HEADERS = {
     "x-rapidapi-key": RAPIDAPI_KEY,
     "x-rapidapi-host": RAPIDAPI_HOST_HOTELS
 }
 
+# Nombre d'hôtels renvoyés, et pagination quand un budget est fixé
+HOTELS_LIMIT         = 9
+HOTELS_MAX_PAGES     = int(os.getenv("HOTELS_MAX_PAGES") or 5)
+HOTELS_PAGE_WAVE     = int(os.getenv("HOTELS_PAGE_WAVE") or 2)
+HOTELS_SEARCH_BUDGET = float(os.getenv("HOTELS_SEARCH_BUDGET") or 8)  # secondes
+HOTELS_PAGE_WORKERS  = int(os.getenv("HOTELS_PAGE_WORKERS") or UPSTREAM_WORKERS)
+
+# Pages suivantes : pool dédié, search_hotels tourne souvent lui-même dans
+# le pool partagé (/api/trip, /api/batch, mode flux)
+_page_fetcher = ThreadPoolExecutor(max_workers=HOTELS_PAGE_WORKERS, thread_name_prefix="hotel-pages")
+
+logger = get_logger("hotels")
+
+# Résultats bruts par paramètres de recherche (le budget est appliqué en aval)
+search_cache = SearchCache("hotels")
+
 def _safe_float(val):
     """Convertit val en float ou retourne +inf."""
     try:
@@ -21,20 +42,38 @@ def _safe_float(val):
     except (TypeError, ValueError):
         return float("inf")
 
+def _within_budget(hotel: dict, budget_max: float | None) -> bool:
+    """Prix total du séjour (en €) inférieur ou égal au budget."""
+    if budget_max is None:
+        return True
+    return _safe_float(hotel.get("price_breakdown", {}).get("gross_price")) <= budget_max
+
 def get_destination_id(city_name: str) -> str | None:
     """
-    Récupère l'ID Booking.com d'une ville à partir de son nom.
+    Récupère l'ID Booking.com d'une ville à partir de son nom,
+    via l'index local partagé (common.geo_index).
     """
-    url = "https://booking-com.p.rapidapi.com/v1/hotels/locations"
-    params = {"name": city_name, "locale": "en-gb"}
     try:
-        r = requests.get(url, headers=HEADERS, params=params)
-        r.raise_for_status()
-        for d in r.json():
-            if d.get("dest_type") == "city":
-                return d.get("dest_id")
+        with metrics.span("resolve_destination"):
+            return geo_index.resolve("hotel_dest", city_name, _fetch_destination_id)
+    except (upstream.RateLimitedError, upstream.CircuitOpenError):
+        raise
     except Exception as e:
-        print("[Erreur get_destination_id]", e)
+        logger.error("[Erreur get_destination_id] %s", e)
+    return None
+
+def _fetch_destination_id(city_name: str) -> str | None:
+    """
+    Interroge Booking.com. Retourne None si la ville est inconnue,
+    lève une exception en cas d'erreur amont.
+    """
+    url = f"{BASE_URL}/v1/hotels/locations"
+    params = {"name": city_name, "locale": "en-gb"}
+    r = upstream.get(url, headers=HEADERS, params=params)
+    r.raise_for_status()
+    for d in r.json():
+        if d.get("dest_type") == "city":
+            return d.get("dest_id")
     return None
 
 def search_hotels(
@@ -48,8 +87,12 @@ def search_hotels(
     """
     Recherche jusqu'à 9 hôtels en EUR, filtre sur budget_max (en €)
     et renvoie la liste formatée.
+
+    Avec un budget, si la première page ne suffit pas, les pages suivantes
+    sont récupérées par vagues parallèles (HOTELS_PAGE_WAVE) jusqu'à avoir
+    9 hôtels, une page vide, HOTELS_MAX_PAGES ou HOTELS_SEARCH_BUDGET secondes.
     """
-    url = "https://booking-com.p.rapidapi.com/v1/hotels/search"
+    url = f"{BASE_URL}/v1/hotels/search"
     params = {
         "checkin_date":       checkin_date,
         "checkout_date":      checkout_date,
@@ -61,34 +104,60 @@ def search_hotels(
         "locale":             "en-gb",
         "units":              "metric",
         "include_adjacency":  "true",
-        "page_number":        0,
         "filter_by_currency": "EUR",   # l’API renvoie déjà en euros
     }
     if children > 0:
         params["children_number"] = children
         params["children_ages"]   = ",".join(["5"] * children)
 
+    def fetch_page(page):
+        page_params = dict(params, page_number=page)
+        return search_cache.get_or_load(
+            tuple(sorted(page_params.items())),
+            lambda: _fetch_hotels(url, page_params),
+        )
+
+    deadline = Deadline(HOTELS_SEARCH_BUDGET)
     try:
-        res = requests.get(url, headers=HEADERS, params=params)
-        res.raise_for_status()
-        results = res.json().get("result", [])
-
-        # Filtrer par budget total en € si nécessaire
-        if budget_max is not None:
-            def total_eur(h):
-                return _safe_float(h["price_breakdown"].get("gross_price"))
-            results = [h for h in results if total_eur(h) <= budget_max]
-
-        # Formater et ne garder que 9 hôtels
-        return [
-            format_hotel_info(h, checkin_date, checkout_date)
-            for h in results[:9]
-        ]
+        with metrics.span("search_hotels"):
+            results  = fetch_page(0)
+            selected = [h for h in results if _within_budget(h, budget_max)][:HOTELS_LIMIT]
+
+            next_page = 1
+            exhausted = not results
+            while (budget_max is not None and not exhausted and len(selected) < HOTELS_LIMIT
+                   and next_page < HOTELS_MAX_PAGES and deadline.remaining() > 0):
+                wave = range(next_page, min(next_page + HOTELS_PAGE_WAVE, HOTELS_MAX_PAGES))
+                pages, _ = run_concurrently({page: (lambda page=page: fetch_page(page)) for page in wave},
+                                            deadline, pool=_page_fetcher)
+                next_page = wave.stop
+                # Pages traitées dans l'ordre ; une page vide ou en échec arrête la recherche
+                for page in wave:
+                    if not pages.get(page):
+                        exhausted = True
+                        break
+                    selected.extend(h for h in pages[page] if _within_budget(h, budget_max))
+                selected = selected[:HOTELS_LIMIT]
 
+        # Formater les hôtels retenus
+        with metrics.span("format"):
+            return [
+                format_hotel_info(h, checkin_date, checkout_date)
+                for h in selected
+            ]
+
+    except (upstream.RateLimitedError, upstream.CircuitOpenError):
+        # Quota / panne amont : à signaler, pas à confondre avec « aucun hôtel »
+        raise
     except Exception as e:
-        print("[Erreur search_hotels]", e)
+        logger.error("[Erreur search_hotels] %s", e)
         return []
 
+def _fetch_hotels(url: str, params: dict) -> list[dict]:
+    res = upstream.get(url, headers=HEADERS, params=params)
+    res.raise_for_status()
+    return res.json().get("result", [])
+
 def format_hotel_info(
     hotel: dict,
     checkin_date: str,
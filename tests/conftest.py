@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Accès au package partagé `common` et au stub RapidAPI (racine du dépôt)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fichiers SQLite partagés (index des villes, quotas) hors du dépôt
+_STATE_DIR = tempfile.mkdtemp(prefix="tests-")
+os.environ.setdefault("GEO_INDEX_PATH", os.path.join(_STATE_DIR, "geo_index.sqlite3"))
+os.environ.setdefault("QUOTA_PATH", os.path.join(_STATE_DIR, "quota.sqlite3"))
+
+from benchmarks import stub_server
+
+
+@pytest.fixture
+def stub():
+    """Stub RapidAPI local sans latence ; retourne (url de base, configuration)."""
+    server, config = stub_server.start(0, latency=0, jitter=0)
+    yield f"http://127.0.0.1:{server.server_port}", config
+    server.shutdown()
+    server.server_close()
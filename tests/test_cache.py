@@ -0,0 +1,55 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from common.cache import SearchCache
+
+
+def _slow_loader(calls, value="résultat", delay=0.2):
+    def loader():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        return value
+    return loader
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    cache = SearchCache("test", ttl=60, stale_ttl=60)
+    calls = []
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: cache.get_or_load("clé", _slow_loader(calls)), range(10)))
+
+    assert results == ["résultat"] * 10
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 9
+
+
+def test_loader_error_is_shared_and_not_cached():
+    cache = SearchCache("test", ttl=60, stale_ttl=60)
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("amont en panne")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(cache.get_or_load, "clé", failing) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+    assert cache.get_or_load("clé", lambda: "ok") == "ok"
+
+
+def test_stale_entry_is_served_then_refreshed_once():
+    cache = SearchCache("test", ttl=0.05, stale_ttl=60)
+    cache.get_or_load("clé", lambda: "ancien")
+    time.sleep(0.1)
+
+    calls = []
+    assert cache.get_or_load("clé", _slow_loader(calls, "nouveau", delay=0.1)) == "ancien"
+    assert cache.get_or_load("clé", _slow_loader(calls, "nouveau", delay=0.1)) == "ancien"
+    time.sleep(0.3)
+    assert len(calls) == 1
+    assert cache.get_or_load("clé", lambda: "inutile") == "nouveau"
@@ -0,0 +1,88 @@
+import importlib.util
+import os
+import sqlite3
+import sys
+
+import pytest
+
+FAVORITES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "favorites_api")
+sys.path.insert(0, FAVORITES_DIR)
+
+from favorites import migrate
+
+
+def _load_app():
+    spec   = importlib.util.spec_from_file_location("favorites_app", os.path.join(FAVORITES_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "favorites.sqlite3"
+    conn = sqlite3.connect(path)
+    # Table d'origine (Supabase) : flights / hotels en JSON, created_at sans NOT NULL
+    conn.execute(
+        "CREATE TABLE favorites (id INTEGER PRIMARY KEY, user_id VARCHAR(64) NOT NULL, destination VARCHAR(255),"
+        " start_date DATE, end_date DATE, itinerary JSON, flights JSON, hotels JSON, created_at DATETIME)"
+    )
+    conn.execute(
+        "INSERT INTO favorites (user_id, destination, flights, hotels, created_at)"
+        " VALUES ('123', 'Rome', '[{\"airline\": \"AF\"}]', '[]', '2024-01-01 10:00:00.000000')"
+    )
+    conn.execute("INSERT INTO favorites (user_id, destination) VALUES ('456', 'Lisbonne')")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    app = _load_app()
+    with app.app_context():
+        assert migrate() == ["colonne flights_zlib", "colonne hotels_zlib", "index ix_favorites_user_created"]
+        assert migrate() == []
+    return app.test_client()
+
+
+def test_legacy_rows_and_new_rows_are_paginated_together(client):
+    response = client.post("/api/favorites/bulk", json={"favorites": [
+        {"user_id": "123", "destination": f"Ville {i}", "flights": [{"airline": "KL", "price": i}]}
+        for i in range(4)
+    ]})
+    assert response.status_code == 201 and len(response.json["ids"]) == 4
+
+    pages, cursor = [], None
+    while True:
+        query = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/favorites/123", query_string=query).json
+        pages.append([f["destination"] for f in page["favorites"]])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert pages == [["Ville 3", "Ville 2"], ["Ville 1", "Ville 0"], ["Rome"]]
+    last = client.get("/api/favorites/123", query_string={"limit": 5}).json["favorites"]
+    assert last[0]["flights"] == [{"airline": "KL", "price": 3}]
+    assert last[-1]["flights"] == [{"airline": "AF"}]
+
+
+def test_legacy_row_without_created_at_is_listed(client):
+    favorites = client.get("/api/favorites/456").json["favorites"]
+    assert [(f["destination"], f["created_at"], f["flights"]) for f in favorites] == [("Lisbonne", None, [])]
+
+
+@pytest.mark.parametrize("payload", [
+    {"destination": "Rome"},
+    {"user_id": "x" * 65},
+    {"user_id": True},
+    {"user_id": "123", "destination": {"city": "Rome"}},
+    {"user_id": "123", "destination": "R" * 256},
+    {"user_id": "123", "start_date": "10/07/2024"},
+    {"user_id": "123", "flights": "AF123"},
+    {"user_id": "123", "itinerary": "aller-retour"},
+])
+def test_invalid_payloads_are_rejected(client, payload):
+    assert client.post("/api/favorites", json=payload).status_code == 400
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/favorites/123", query_string={"cursor": "zzz"}).status_code == 400
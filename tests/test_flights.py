@@ -0,0 +1,63 @@
+import importlib.util
+import os
+import sys
+import time
+
+import pytest
+
+FLIGHTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flights_api")
+sys.path.insert(0, FLIGHTS_DIR)
+
+import flights
+
+PAYLOAD = {"from": "Paris", "to": "Rome", "depart_date": "2030-07-10", "return_date": "2030-07-17", "adults": 2}
+
+
+@pytest.fixture
+def flights_app(stub, monkeypatch):
+    """Application vols branchée sur le stub ; retourne (module, client)."""
+    base_url, _ = stub
+    monkeypatch.setattr(flights, "BASE_URL", base_url)
+    flights.search_cache.clear()
+    spec   = importlib.util.spec_from_file_location("flights_app", os.path.join(FLIGHTS_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module, module.app.test_client()
+    flights.search_cache.clear()
+
+
+def test_both_legs_within_the_deadline(flights_app):
+    _, client = flights_app
+    body = client.post("/api/flights", json=PAYLOAD).get_json()
+    assert len(body["outbound"]) == len(body["return"]) == 5
+    assert "errors" not in body
+
+
+def test_leg_past_the_deadline_is_reported_as_timeout(flights_app, stub, monkeypatch):
+    module, client = flights_app
+    _, config = stub
+    search = module.search_flights
+
+    def search_flights(from_id, *args, **kwargs):
+        results = search(from_id, *args, **kwargs)
+        # Amont lent pour le retour seulement (Rome -> Paris)
+        if from_id.startswith("ROM"):
+            time.sleep(1)
+        return results
+
+    # Codes d'aéroport résolus d'avance : seule la recherche compte dans l'échéance
+    client.post("/api/flights", json=PAYLOAD)
+    flights.search_cache.clear()
+    config.latency = 0.05
+    monkeypatch.setattr(module, "FLIGHTS_DEADLINE", 0.5)
+    monkeypatch.setattr(module, "search_flights", search_flights)
+
+    start    = time.monotonic()
+    response = client.post("/api/flights", json=PAYLOAD)
+    body     = response.get_json()
+
+    assert response.status_code == 200
+    assert time.monotonic() - start < 0.9
+    assert len(body["outbound"]) == 5
+    assert body["return"] == []
+    assert body["errors"] == {"return": "timeout"}
@@ -0,0 +1,28 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+FLIGHTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flights_api")
+sys.path.insert(0, FLIGHTS_DIR)
+
+
+@pytest.fixture
+def client():
+    spec   = importlib.util.spec_from_file_location("flights_app", os.path.join(FLIGHTS_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app.test_client()
+
+
+@pytest.mark.parametrize("field, value", [
+    ("window", "trois"),
+    ("window", [1]),
+    ("adults", "deux"),
+    ("depart_date", "10/07/2030"),
+])
+def test_invalid_calendar_parameters_are_rejected(client, field, value):
+    payload = {"from": "Paris", "to": "Rome", "depart_date": "2030-07-10", field: value}
+    response = client.post("/api/flights/calendar", json=payload)
+    assert response.status_code == 400
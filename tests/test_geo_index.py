@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flights_api"))
+
+import flights
+from common.geo_index import GeoIndex, normalize_city
+
+
+@pytest.fixture
+def index(tmp_path):
+    return GeoIndex(str(tmp_path / "geo_index.sqlite3"), ttl=60, negative_ttl=60)
+
+
+def _fetcher(calls, value="CDG.AIRPORT", delay=0.0):
+    def fetch(city):
+        calls.append(city)
+        time.sleep(delay)
+        return value
+    return fetch
+
+
+def test_spellings_of_a_city_share_one_entry(index):
+    calls = []
+    for city in ("Saint-Étienne", "  saint-etienne ", "SAINT-ÉTIENNE"):
+        assert index.resolve("airport", city, _fetcher(calls)) == "CDG.AIRPORT"
+
+    assert calls == ["Saint-Étienne"]
+    assert normalize_city("  Saint-Étienne\t") == "saint-etienne"
+    rows = sqlite3.connect(index.path).execute("SELECT key FROM geo_lookup").fetchall()
+    assert rows == [("saint-etienne",)]
+
+
+def test_unknown_city_is_cached_with_the_negative_ttl(index):
+    index.negative_ttl = 0.2
+    calls = []
+    assert index.resolve("airport", "Atlantide", _fetcher(calls, value=None)) is None
+    assert index.resolve("airport", "Atlantide", _fetcher(calls, value=None)) is None
+    assert len(calls) == 1
+
+    time.sleep(0.3)
+    assert index.resolve("airport", "Atlantide", _fetcher(calls)) == "CDG.AIRPORT"
+    assert len(calls) == 2
+    # Une ville connue garde le TTL positif
+    time.sleep(0.3)
+    assert index.resolve("airport", "Atlantide", _fetcher(calls)) == "CDG.AIRPORT"
+    assert len(calls) == 2
+
+
+def test_stale_value_is_served_when_upstream_fails(index):
+    index.ttl = 0.1
+    index.resolve("airport", "Paris", _fetcher([]))
+    time.sleep(0.2)
+
+    def failing(city):
+        raise requests.ConnectionError("amont indisponible")
+
+    assert index.resolve("airport", "Paris", failing) == "CDG.AIRPORT"
+    assert index.get("airport", "Paris")[2]  # toujours expirée : rien n'a été réécrit
+
+
+def test_upstream_http_error_is_not_cached(index, stub, monkeypatch):
+    base_url, _ = stub
+    # Endpoint inexistant : 404 avec un corps JSON sans "data"
+    monkeypatch.setattr(flights, "BASE_URL", f"{base_url}/inconnu")
+    with pytest.raises(requests.HTTPError):
+        index.resolve("airport", "Lyon", flights._fetch_airport_code)
+    assert index.get("airport", "Lyon") == (False, None, False)
+
+    monkeypatch.setattr(flights, "BASE_URL", base_url)
+    assert index.resolve("airport", "Lyon", flights._fetch_airport_code) == "LYO.AIRPORT"
+
+
+def test_concurrent_resolutions_share_one_fetch(index):
+    calls = []
+    fetch = _fetcher(calls, delay=0.2)
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: index.resolve("airport", "Rome", fetch), range(10)))
+
+    assert results == ["CDG.AIRPORT"] * 10
+    assert len(calls) == 1
+
+
+def test_concurrent_resolutions_share_the_error(index):
+    calls   = []
+    started = threading.Event()
+
+    def failing(city):
+        calls.append(city)
+        started.set()
+        time.sleep(0.2)
+        raise requests.ConnectionError("amont indisponible")
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader    = pool.submit(index.resolve, "airport", "Milan", failing)
+        started.wait()
+        followers = [pool.submit(index.resolve, "airport", "Milan", failing) for _ in range(4)]
+        for future in [leader, *followers]:
+            with pytest.raises(requests.ConnectionError):
+                future.result()
+
+    assert len(calls) == 1
+    assert index.get("airport", "Milan") == (False, None, False)
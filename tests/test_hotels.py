@@ -0,0 +1,36 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hotels_api"))
+
+import hotel_api
+from common import concurrency
+from common.concurrency import Deadline, run_concurrently
+
+
+@pytest.fixture
+def hotels(stub, monkeypatch):
+    base_url, config = stub
+    monkeypatch.setattr(hotel_api, "BASE_URL", base_url)
+    monkeypatch.setattr(hotel_api, "HOTELS_SEARCH_BUDGET", 3)
+    hotel_api.search_cache.clear()
+    yield config
+    hotel_api.search_cache.clear()
+
+
+def test_budget_pages_are_fetched_while_shared_pool_is_saturated(hotels, monkeypatch):
+    # Autant de recherches que de threads dans le pool partagé : les pages
+    # suivantes ne doivent pas attendre un thread de ce pool
+    monkeypatch.setattr(concurrency, "executor", ThreadPoolExecutor(max_workers=2))
+    searches = {
+        city: (lambda dest_id=dest_id: hotel_api.search_hotels(dest_id, "2030-01-10", "2030-01-12", 2, 0, budget_max=300))
+        for city, dest_id in (("Paris", "-1"), ("Rome", "-2"))
+    }
+    results, errors = run_concurrently(searches, Deadline(10))
+
+    assert errors == {}
+    assert [len(results[city]) for city in searches] == [hotel_api.HOTELS_LIMIT] * 2
+    assert hotels.calls["/v1/hotels/search"] == 6
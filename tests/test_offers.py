@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "flights_api"))
+
+from offers import BUDGET_THRESHOLDS, filters_from_payload, offer_price, select_offers
+from utils import format_flights
+
+
+@pytest.fixture(scope="module")
+def flights():
+    with open(os.path.join(ROOT_DIR, "benchmarks", "fixtures", "searchFlights.json"), encoding="utf-8") as f:
+        return json.load(f)["data"]["flightOffers"]
+
+
+def test_max_price_applies_to_all_passengers(flights):
+    offers = select_offers(flights, total_passengers=3, max_price=900, k=len(flights))
+    expected = [offer_price(f) for f in flights if offer_price(f) * 3 <= 900]
+    assert [o.price for o in offers] == expected
+    # 319.99 € par passager : sous le plafond seul, au-dessus pour trois
+    assert any(300 < offer_price(f) <= 900 for f in flights)
+
+
+def test_budget_level_applies_per_passenger(flights):
+    threshold = BUDGET_THRESHOLDS["Économique"]
+    offers = select_offers(flights, total_passengers=3, budget_level="Économique", k=len(flights))
+    assert [o.price for o in offers] == [offer_price(f) for f in flights if offer_price(f) <= threshold]
+    assert any(o.price * 3 > threshold for o in offers)
+
+
+def test_unsorted_selection_keeps_upstream_order_and_stops_at_k(flights):
+    consumed = []
+
+    def upstream():
+        for flight in flights:
+            consumed.append(flight)
+            yield flight
+
+    offers = select_offers(upstream(), k=2)
+    assert [o.price for o in offers] == [offer_price(f) for f in flights[:2]]
+    assert len(consumed) == 2
+
+
+def test_sorted_selection_returns_the_k_best(flights):
+    offers = select_offers(flights, sort="price", k=3)
+    assert [o.price for o in offers] == sorted(offer_price(f) for f in flights)[:3]
+
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"budgetFlights": "500"}, {}),
+    ({"budgetFlights": "500", "useCustomBudget": True}, {"max_price": 500.0}),
+    ({"budgetFlights": "cinq cents", "useCustomBudget": True}, {}),
+    ({"maxStops": "0"}, {"max_stops": 0}),
+    ({"maxStops": "direct"}, {}),
+    ({"budgetLevel": "Luxe", "sort": "duration"}, {"budget_level": "Luxe", "sort": "duration"}),
+])
+def test_filters_from_payload(payload, expected):
+    assert filters_from_payload(payload) == {"sort": None, "budget_level": None, **expected}
+
+
+def test_format_flights_matches_the_previous_format(flights):
+    # Sortie de l'ancien utils.format_flight_info sur la même offre
+    formatted = format_flights(flights, 3, 2, 1, "ECONOMY", "2030-07-17")
+    assert formatted[0] == {
+        "departure_city": "Paris",
+        "arrival_city":   "Rome",
+        "departure_time": "06:05",
+        "arrival_time":   "10:00",
+        "duration":       "3h30m",
+        "price":          413.97,
+        "currency":       "EUR",
+        "airline":        "easyJet",
+        "logo":           "https://r-xx.bstatic.com/data/airlines_logo/U2.png",
+        "booking_url":    "https://www.skyscanner.fr/transport/flights/cdg/fco/300710/300717/"
+                          "?adults=2&children=1&cabinclass=economy",
+    }
+    assert [f["price"] for f in formatted] == [413.97, 1181.97, 293.97, 743.97, 959.97]
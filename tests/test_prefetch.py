@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from common import upstream
+from common.prefetch import Prefetcher
+from common.quota import SharedBuckets
+
+
+@pytest.fixture
+def request_log(tmp_path):
+    path = tmp_path / "requests.log"
+    with open(path, "w", encoding="utf-8") as f:
+        for city in ("Paris", "Rome", "Lisbonne", "Berlin", "Madrid"):
+            f.write(json.dumps({"path": "/api/flights", "payload": {"from": city}}) + "\n")
+    return str(path)
+
+
+def _prefetcher(stub, request_log, shared, budget):
+    base_url, _ = stub
+
+    def warm(city):
+        # Résolution de la ville puis recherche : deux appels amont par clé
+        upstream.get(f"{base_url}/api/v1/flights/searchDestination", params={"query": city})
+        upstream.get(f"{base_url}/api/v1/flights/searchFlights", params={"fromId": city})
+
+    return Prefetcher("flights", "/api/flights", lambda payload: payload["from"], warm,
+                      log_path=request_log, budget=budget, interval=3600, shared=shared)
+
+
+def test_budget_counts_own_calls_and_is_shared_by_workers(stub, request_log, tmp_path):
+    _, config = stub
+    shared  = SharedBuckets(str(tmp_path / "quota.sqlite3"))
+    workers = [_prefetcher(stub, request_log, shared, budget=4) for _ in range(2)]
+
+    # Trafic interactif hors préchargement : ne consomme pas le budget
+    upstream.get(f"{stub[0]}/api/v1/flights/searchFlights", params={"fromId": "Nice"})
+
+    stats = [worker.run_once() for worker in workers]
+    assert stats[0] == {"warmed": 2, "upstream_calls": 4}
+    assert stats[1] == {"warmed": 0, "upstream_calls": 0}
+    assert config.calls["/api/v1/flights/searchDestination"] == 2
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from common import scheduler as schedulers
+from common.quota import SharedBuckets
+from common.scheduler import QueueTimeout, Scheduler
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def shared(tmp_path):
+    return SharedBuckets(str(tmp_path / "quota.sqlite3"))
+
+
+def test_rate_is_shared_between_processes(shared):
+    # Deux ordonnanceurs sur le même fichier : comme deux workers gunicorn
+    first  = Scheduler("api.example", rate=1, burst=2, max_wait=0.3, shared=shared)
+    second = Scheduler("api.example", rate=1, burst=2, max_wait=0.3, shared=shared)
+    for scheduler in (first, second):
+        scheduler.acquire()
+        scheduler.release(200)
+    with pytest.raises(QueueTimeout):
+        first.acquire()
+
+
+def test_hosts_have_separate_quotas(shared):
+    flights = Scheduler("flights.example", rate=1, burst=1, max_wait=0.3, shared=shared)
+    hotels  = Scheduler("hotels.example", rate=1, burst=1, max_wait=0.3, shared=shared)
+    flights.acquire()
+    hotels.acquire()
+    with pytest.raises(QueueTimeout):
+        flights.acquire()
+
+
+def test_rate_limited_response_pauses_every_process(shared):
+    first  = Scheduler("api.example", rate=10, burst=10, max_wait=0.3, shared=shared)
+    second = Scheduler("api.example", rate=10, burst=10, max_wait=0.3, shared=shared)
+    first.acquire()
+    first.release(429, retry_after=5)
+    assert first.limit == first.max_concurrency / 2
+    with pytest.raises(QueueTimeout):
+        second.acquire()
+
+
+def test_interactive_calls_pass_before_background(shared):
+    scheduler = Scheduler("api.example", rate=10, burst=1, max_wait=2, shared=shared)
+    scheduler.acquire()
+    order = []
+
+    def call(name, background):
+        if background:
+            with schedulers.background():
+                scheduler.acquire()
+        else:
+            scheduler.acquire()
+        order.append(name)
+
+    threads = [threading.Thread(target=call, args=("background", True))]
+    threads[0].start()
+    time.sleep(0.02)
+    threads.append(threading.Thread(target=call, args=("interactive", False)))
+    threads[1].start()
+    for thread in threads:
+        thread.join()
+    assert order == ["interactive", "background"]
+
+
+def test_stats_do_not_write_the_bucket(shared):
+    scheduler = Scheduler("api.example", rate=1, burst=5, shared=shared)
+    scheduler.acquire()
+    scheduler.release(200)
+    conn = sqlite3.connect(shared.path)
+    row  = conn.execute("SELECT tokens, refilled_at FROM buckets").fetchone()
+    time.sleep(0.05)
+    assert 4 < scheduler.stats()["tokens"] <= 5
+    assert conn.execute("SELECT tokens, refilled_at FROM buckets").fetchone() == row
+
+
+def test_greenlets_share_the_thread_connection(tmp_path):
+    # Sous gevent (monkey-patching), threading.local est propre à chaque greenlet :
+    # la connexion doit suivre le thread système, d'où un process dédié
+    pytest.importorskip("gevent")
+    script = (
+        "from gevent import monkey; monkey.patch_all()\n"
+        "import gevent, sys\n"
+        "from common.quota import SharedBuckets\n"
+        "shared = SharedBuckets(sys.argv[1])\n"
+        "gevent.joinall([gevent.spawn(shared.try_take, 'k', 1, 5) for _ in range(3)])\n"
+        "from common import sqlite\n"
+        "print(len(sqlite._connections))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path / "quota.sqlite3")],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "1"
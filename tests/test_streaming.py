@@ -0,0 +1,105 @@
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "flights_api"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "hotels_api"))
+
+import flights
+import hotel_api
+
+FLIGHTS = {"from": "Paris", "to": "Rome", "depart_date": "2030-07-10", "return_date": "2030-07-17", "adults": 2}
+HOTELS  = {"destination": "Rome", "startDate": "2030-07-10", "endDate": "2030-07-12"}
+
+
+@pytest.fixture
+def load_app(stub, monkeypatch):
+    """Charge l'application d'un service branchée sur le stub ; retourne un client de test."""
+    base_url, _ = stub
+    monkeypatch.setattr(flights, "BASE_URL", base_url)
+    monkeypatch.setattr(hotel_api, "BASE_URL", base_url)
+    flights.search_cache.clear()
+    hotel_api.search_cache.clear()
+
+    def load(directory, slow_outbound=False):
+        spec   = importlib.util.spec_from_file_location(f"{directory}_app", os.path.join(ROOT_DIR, directory, "app.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if slow_outbound:
+            # L'aller termine en dernier : il doit arriver après les autres sections
+            search = module.search_flights
+
+            def search_flights(from_id, *args, **kwargs):
+                if from_id.startswith("PAR"):
+                    time.sleep(0.3)
+                return search(from_id, *args, **kwargs)
+            monkeypatch.setattr(module, "search_flights", search_flights)
+        return module.app.test_client()
+
+    yield load
+    flights.search_cache.clear()
+    hotel_api.search_cache.clear()
+
+
+def _events(response, mode):
+    """Événements du flux, dans l'ordre d'émission."""
+    body = response.get_data(as_text=True)
+    if mode == "ndjson":
+        assert response.mimetype == "application/x-ndjson"
+        return [json.loads(line) for line in body.splitlines()]
+    assert response.mimetype == "text/event-stream"
+    events = []
+    for block in body.split("\n\n")[:-1]:
+        event_line, data_line = block.split("\n")
+        event = json.loads(data_line.removeprefix("data: "))
+        assert event_line == f"event: {event['section']}"
+        events.append(event)
+    assert body.endswith("\n\n")
+    return events
+
+
+@pytest.mark.parametrize("mode", ["ndjson", "sse"])
+def test_flights_stream_sections_as_they_complete(load_app, mode):
+    client   = load_app("flights_api", slow_outbound=True)
+    response = client.post(f"/api/flights?stream={mode}", json=FLIGHTS)
+    events   = _events(response, mode)
+
+    assert [e["section"] for e in events] == ["return", "outbound", "done"]
+    assert events[0]["data"] and events[1]["data"]
+    assert events[-1] == {"section": "done", "errors": {}}
+
+
+@pytest.mark.parametrize("mode", ["ndjson", "sse"])
+def test_hotels_stream(load_app, mode):
+    client   = load_app("hotels_api")
+    response = client.post(f"/api/hotels?stream={mode}", json=HOTELS)
+    events   = _events(response, mode)
+
+    assert [e["section"] for e in events] == ["hotels", "done"]
+    assert len(events[0]["data"]) == hotel_api.HOTELS_LIMIT
+    assert events[-1] == {"section": "done", "errors": {}}
+
+
+@pytest.mark.parametrize("mode", ["ndjson", "sse"])
+def test_trip_stream_reports_errors_in_done(load_app, stub, mode):
+    _, config = stub
+    config.unknown_cities = {"atlantide"}
+    client   = load_app("trip_api", slow_outbound=True)
+    response = client.post(f"/api/trip?stream={mode}", json={**FLIGHTS, "destination": "Atlantide"})
+    events   = _events(response, mode)
+
+    assert sorted(e["section"] for e in events[:2]) == ["hotels", "return"]
+    assert [e["section"] for e in events[2:]] == ["outbound", "done"]
+    assert {"section": "hotels", "error": "not_found"} in events
+    assert events[-1] == {"section": "done", "errors": {"hotels": "not_found"}}
+
+
+def test_accept_header_selects_the_stream(load_app):
+    client   = load_app("hotels_api")
+    response = client.post("/api/hotels", json=HOTELS, headers={"Accept": "text/event-stream"})
+    assert [e["section"] for e in _events(response, "sse")] == ["hotels", "done"]
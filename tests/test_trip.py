@@ -0,0 +1,82 @@
+import importlib.util
+import os
+import sys
+import time
+
+import pytest
+
+TRIP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trip_api")
+
+PAYLOAD = {
+    "from": "Paris", "to": "Rome", "depart_date": "2030-07-10", "return_date": "2030-07-17",
+    "adults": 2,
+}
+
+
+@pytest.fixture
+def trip(stub, monkeypatch):
+    """Application trip branchée sur le stub ; retourne (module, client, configuration du stub)."""
+    base_url, config = stub
+    spec   = importlib.util.spec_from_file_location("trip_app", os.path.join(TRIP_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    flights, hotel_api = sys.modules["flights"], sys.modules["hotel_api"]
+    monkeypatch.setattr(flights, "BASE_URL", base_url)
+    monkeypatch.setattr(hotel_api, "BASE_URL", base_url)
+    flights.search_cache.clear()
+    hotel_api.search_cache.clear()
+    yield module, module.app.test_client(), config
+    flights.search_cache.clear()
+    hotel_api.search_cache.clear()
+
+
+@pytest.mark.parametrize("field, value", [("adults", "deux"), ("children", [1])])
+def test_invalid_passengers_are_rejected(trip, field, value):
+    _, client, _ = trip
+    response = client.post("/api/trip", json={**PAYLOAD, field: value})
+    assert response.status_code == 400
+
+
+def test_lookup_past_the_deadline_is_reported_as_timeout(trip, monkeypatch):
+    module, client, _ = trip
+
+    def slow_destination(city):
+        time.sleep(1)
+        return "-1"
+
+    monkeypatch.setattr(module, "TRIP_DEADLINE", 0.3)
+    monkeypatch.setattr(module, "get_destination_id", slow_destination)
+    body = client.post("/api/trip", json={**PAYLOAD, "destination": "Rome centre"}).get_json()
+
+    assert body["outbound"] and body["return"]
+    assert body["errors"] == {"hotels": "timeout"}
+
+
+def test_batch_deduplicates_searches_and_keeps_input_order(trip):
+    _, client, config = trip
+    config.unknown_cities = {"atlantide"}
+    flight = {"type": "flights", "from": "Paris", "to": "Rome",
+              "depart_date": "2030-07-10", "return_date": "2030-07-17", "adults": 2}
+    hotel  = {"type": "hotels", "destination": "Rome", "startDate": "2030-07-10", "endDate": "2030-07-12"}
+    searches = [
+        flight,
+        hotel,
+        {**flight, "from": " paris ", "to": "ROME"},
+        {**hotel, "destination": "rome"},
+        {**flight, "to": "Atlantide"},
+        {"type": "flights", "from": "Paris"},
+        "Paris - Rome",
+    ]
+    response = client.post("/api/batch", json={"searches": searches})
+    results  = response.get_json()["results"]
+
+    assert response.status_code == 200
+    # Aller + retour une seule fois pour les deux recherches de vols identiques, un seul hôtel
+    assert config.calls["/api/v1/flights/searchFlights"] == 2
+    assert config.calls["/v1/hotels/search"] == 1
+    assert [r.get("type") for r in results] == ["flights", "hotels", "flights", "hotels", "flights", None, None]
+    assert results[0]["outbound"] and results[0]["return"] and "errors" not in results[0]
+    assert results[2] == results[0]
+    assert results[1]["hotels"] and results[3] == results[1]
+    assert results[4] == {"type": "flights", "errors": {"to": "not_found"}}
+    assert results[5] == results[6] == {"error": "Champs manquants ou type inconnu"}
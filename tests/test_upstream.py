@@ -0,0 +1,57 @@
+import pytest
+
+from common.upstream import CircuitOpenError, UpstreamClient, UpstreamError
+
+
+def _client(base_url):
+    client  = UpstreamClient(retries=0, backoff=0)
+    breaker = client.breaker(base_url.split("://", 1)[1])
+    breaker.threshold = 1
+    breaker.cooldown  = 0
+    return client, breaker
+
+
+def test_truncated_trial_call_reopens_breaker(stub):
+    base_url, config = stub
+    url = f"{base_url}/api/v1/flights/searchDestination"
+    client, breaker = _client(base_url)
+    breaker.record_failure()
+    assert breaker.opened_at is not None
+
+    # Appel d'essai semi-ouvert sur une réponse tronquée (ChunkedEncodingError)
+    config.truncate_rate = 1.0
+    with pytest.raises(UpstreamError) as excinfo:
+        client.get(url, params={"query": "Paris"})
+    assert not isinstance(excinfo.value, CircuitOpenError)
+    assert breaker.opened_at is not None and not breaker._trial
+
+    # L'amont répond de nouveau : le prochain essai referme le disjoncteur
+    config.truncate_rate = 0.0
+    assert client.get(url, params={"query": "Paris"}).status_code == 200
+    assert breaker.opened_at is None
+
+
+def test_open_breaker_refuses_without_calling_upstream(stub):
+    base_url, config = stub
+    client, breaker = _client(base_url)
+    breaker.cooldown = 60
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        client.get(f"{base_url}/api/v1/flights/searchDestination", params={"query": "Paris"})
+    assert config.calls["/api/v1/flights/searchDestination"] == 0
+
+
+def test_server_errors_open_breaker_after_threshold(stub):
+    base_url, config = stub
+    url = f"{base_url}/api/v1/flights/searchDestination"
+    client, breaker = _client(base_url)
+    breaker.threshold = 2
+    breaker.cooldown  = 60
+    config.error_rate = 1.0
+
+    assert client.get(url, params={"query": "Paris"}).status_code == 502
+    assert breaker.opened_at is None
+    assert client.get(url, params={"query": "Paris"}).status_code == 502
+    with pytest.raises(CircuitOpenError):
+        client.get(url, params={"query": "Paris"})
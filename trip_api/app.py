@@ -0,0 +1,298 @@
+# app.py
+
+import contextvars
+import os
+import sys
+from concurrent.futures import TimeoutError as FutureTimeout
+from dotenv import load_dotenv
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+
+# Accès au package partagé `common` et aux modules des services vols / hôtels
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(1, os.path.join(ROOT_DIR, "flights_api"))
+sys.path.insert(2, os.path.join(ROOT_DIR, "hotels_api"))
+
+from common import geo_index, metrics, streaming
+from common.concurrency import Deadline, executor, iter_completed, run_concurrently
+from common.log import get_logger
+from flights import CABIN_MAP, get_airport_code, search_flights
+from hotel_api import get_destination_id, search_hotels
+from offers import filters_from_payload
+from utils import format_flights
+
+# Chargement des variables d'environnement
+load_dotenv()
+
+# Échéance globale d'une recherche de voyage (secondes)
+TRIP_DEADLINE = float(os.getenv("TRIP_DEADLINE") or 20)
+
+# Recherches groupées : taille max, appels simultanés max, échéance (secondes)
+BATCH_MAX_ITEMS   = int(os.getenv("BATCH_MAX_ITEMS") or 50)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY") or 8)
+BATCH_DEADLINE    = float(os.getenv("BATCH_DEADLINE") or 60)
+
+app = Flask(__name__)
+origins = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
+CORS(
+    app,
+    resources={r"/api/*": {"origins": origins}},
+    methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    supports_credentials=True
+)
+metrics.init_app(app, "trip")
+logger = get_logger("trip_api")
+
+
+class NotFound(Exception):
+    """Ville introuvable côté amont (code aéroport ou dest_id)."""
+    code = "not_found"
+
+
+class LookupTimeout(Exception):
+    """Résolution de ville non terminée à l'échéance."""
+    code = "timeout"
+
+
+@app.route("/api/trip", methods=["POST"])
+def api_trip():
+    """
+    Vols aller / retour + hôtels en un seul appel.
+    Accepte l'union des payloads /api/flights et /api/hotels ; chaque section
+    échouée ou hors délai est signalée dans "errors" sans bloquer les autres.
+    """
+    data = request.get_json()
+    logger.info("[📥 API Trip] Données reçues: %s", data)
+
+    if not data:
+        return jsonify({"error": "Requête vide"}), 400
+
+    from_city   = data.get("from")
+    to_city     = data.get("to") or data.get("destination")
+    destination = data.get("destination") or to_city
+    depart_date = data.get("depart_date") or data.get("startDate")
+    return_date = data.get("return_date") or data.get("endDate")
+    cabin_class = CABIN_MAP.get(data.get("budget", "Économique"), "ECONOMY")
+    filters     = filters_from_payload(data)
+    use_custom  = data.get("useCustomBudget", False)
+
+    try:
+        budget_max = float(data.get("budgetHotels") or 0)
+    except (ValueError, TypeError):
+        budget_max = 0
+
+    if not from_city or not to_city or not depart_date or not return_date:
+        return jsonify({"error": "Champs manquants"}), 400
+
+    try:
+        adults   = int(data.get("adults", 1))
+        children = int(data.get("children", 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Nombre de passagers invalide"}), 400
+    total_passengers = adults + children
+
+    deadline = Deadline(TRIP_DEADLINE)
+
+    # Destination résolue une seule fois pour les deux APIs, en parallèle ;
+    # le contexte (priorité, compteur d'appels) suit chaque résolution dans le pool
+    lookups = {
+        "from": executor.submit(contextvars.copy_context().run, get_airport_code, from_city),
+        "to":   executor.submit(contextvars.copy_context().run, get_airport_code, to_city),
+        "dest": executor.submit(contextvars.copy_context().run, get_destination_id, destination),
+    }
+
+    def lookup(name):
+        try:
+            value = lookups[name].result(timeout=deadline.remaining())
+        except FutureTimeout:
+            raise LookupTimeout(f"Ville non résolue à l'échéance ({name})") from None
+        if not value:
+            raise NotFound(f"Ville introuvable ({name})")
+        return value
+
+    tasks = {
+        "outbound": lambda: format_flights(
+            search_flights(lookup("from"), lookup("to"), depart_date, adults, children, cabin_class),
+            total_passengers, adults, children, cabin_class, return_date, **filters),
+        "return":   lambda: format_flights(
+            search_flights(lookup("to"), lookup("from"), return_date, adults, children, cabin_class),
+            total_passengers, adults, children, cabin_class, depart_date, **filters),
+        "hotels":   lambda: search_hotels(
+            lookup("dest"), depart_date, return_date, adults, children,
+            budget_max=budget_max if use_custom else None),
+    }
+
+    stream_mode = streaming.requested_mode(request)
+    if stream_mode:
+        return streaming.stream_sections(iter_completed(tasks, deadline), stream_mode)
+
+    sections, errors = run_concurrently(tasks, deadline)
+
+    response = {
+        "outbound": sections.get("outbound", []),
+        "return":   sections.get("return", []),
+        "hotels":   sections.get("hotels", []),
+    }
+    if errors:
+        response["errors"] = errors
+
+    logger.info("[✅ API Trip] Aller: %s | Retour: %s | Hôtels: %s",
+                len(response["outbound"]), len(response["return"]), len(response["hotels"]))
+    with metrics.span("serialize"):
+        return jsonify(response), 200
+
+def _parse_batch_item(item):
+    """Recherche normalisée d'un élément du lot, ou None si champs manquants."""
+    kind     = item.get("type")
+    adults   = int(item.get("adults", 1))
+    children = int(item.get("children", 0))
+    if kind == "flights":
+        if not item.get("from") or not item.get("to") or not item.get("depart_date"):
+            return None
+        return {
+            "type":        kind,
+            "from":        geo_index.normalize_city(item["from"]),
+            "to":          geo_index.normalize_city(item["to"]),
+            "depart_date": item["depart_date"],
+            "return_date": item.get("return_date"),
+            "adults":      adults,
+            "children":    children,
+            "cabin_class": CABIN_MAP.get(item.get("budget", "Économique"), "ECONOMY"),
+            "filters":     filters_from_payload(item),
+        }
+    if kind == "hotels":
+        if not item.get("destination") or not item.get("startDate") or not item.get("endDate"):
+            return None
+        try:
+            budget_max = float(item.get("budgetHotels") or 0)
+        except (ValueError, TypeError):
+            budget_max = 0
+        return {
+            "type":          kind,
+            "destination":   geo_index.normalize_city(item["destination"]),
+            "checkin_date":  item["startDate"],
+            "checkout_date": item["endDate"],
+            "adults":        adults,
+            "children":      children,
+            "budget_max":    budget_max if item.get("useCustomBudget", False) else None,
+        }
+    return None
+
+def _flight_search_key(spec, origin, dest, day):
+    return ("flights", origin, dest, day, spec["adults"], spec["children"], spec["cabin_class"])
+
+def _hotel_search_key(spec, dest_id):
+    return ("hotels", dest_id, spec["checkin_date"], spec["checkout_date"],
+            spec["adults"], spec["children"], spec["budget_max"])
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """
+    Lot de recherches vols / hôtels ({"searches": [{"type": "flights", ...}, ...]}).
+    Les résolutions de villes et les recherches identiques ne sont faites
+    qu'une fois ; les résultats sont renvoyés dans l'ordre, erreurs par élément.
+    """
+    data = request.get_json()
+    items = (data or {}).get("searches")
+    logger.info("[📥 API Batch] %s recherche(s) reçue(s)", len(items) if isinstance(items, list) else 0)
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Requête vide"}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"{BATCH_MAX_ITEMS} recherches maximum par lot"}), 400
+
+    specs = []
+    for item in items:
+        try:
+            specs.append(_parse_batch_item(item) if isinstance(item, dict) else None)
+        except (ValueError, TypeError):
+            specs.append(None)
+
+    deadline = Deadline(BATCH_DEADLINE)
+
+    # 1. Résolutions de villes uniques
+    lookups = {}
+    for spec in filter(None, specs):
+        if spec["type"] == "flights":
+            lookups[("airport", spec["from"])] = lambda city=spec["from"]: get_airport_code(city)
+            lookups[("airport", spec["to"])]   = lambda city=spec["to"]: get_airport_code(city)
+        else:
+            lookups[("hotel_dest", spec["destination"])] = lambda city=spec["destination"]: get_destination_id(city)
+    codes, lookup_errors = run_concurrently(lookups, deadline, BATCH_CONCURRENCY)
+
+    def code(kind, city):
+        value = codes.get((kind, city))
+        if not value:
+            return None, lookup_errors.get((kind, city), "not_found")
+        return value, None
+
+    # 2. Recherches amont uniques
+    searches = {}
+    for spec in filter(None, specs):
+        if spec["type"] == "flights":
+            from_code, _ = code("airport", spec["from"])
+            to_code, _   = code("airport", spec["to"])
+            if not from_code or not to_code:
+                continue
+            legs = [(from_code, to_code, spec["depart_date"])]
+            if spec["return_date"]:
+                legs.append((to_code, from_code, spec["return_date"]))
+            for origin, dest, day in legs:
+                key = _flight_search_key(spec, origin, dest, day)
+                searches[key] = lambda key=key: search_flights(*key[1:])
+        else:
+            dest_id, _ = code("hotel_dest", spec["destination"])
+            if not dest_id:
+                continue
+            key = _hotel_search_key(spec, dest_id)
+            searches[key] = lambda key=key: search_hotels(*key[1:6], budget_max=key[6])
+    found, search_errors = run_concurrently(searches, deadline, BATCH_CONCURRENCY)
+
+    # 3. Résultats dans l'ordre d'entrée
+    results = []
+    for spec in specs:
+        if spec is None:
+            results.append({"error": "Champs manquants ou type inconnu"})
+            continue
+        result, errors = {"type": spec["type"]}, {}
+        if spec["type"] == "flights":
+            from_code, from_error = code("airport", spec["from"])
+            to_code, to_error     = code("airport", spec["to"])
+            if from_error or to_error:
+                errors.update({k: v for k, v in (("from", from_error), ("to", to_error)) if v})
+            else:
+                total_passengers = spec["adults"] + spec["children"]
+                legs = [("outbound", from_code, to_code, spec["depart_date"], spec["return_date"])]
+                if spec["return_date"]:
+                    legs.append(("return", to_code, from_code, spec["return_date"], spec["depart_date"]))
+                for section, origin, dest, day, other_day in legs:
+                    key = _flight_search_key(spec, origin, dest, day)
+                    if key in found:
+                        result[section] = format_flights(
+                            found[key], total_passengers, spec["adults"], spec["children"],
+                            spec["cabin_class"], other_day, **spec["filters"])
+                    else:
+                        errors[section] = search_errors.get(key, "timeout")
+        else:
+            dest_id, dest_error = code("hotel_dest", spec["destination"])
+            if dest_error:
+                errors["destination"] = dest_error
+            else:
+                key = _hotel_search_key(spec, dest_id)
+                if key in found:
+                    result["hotels"] = found[key]
+                else:
+                    errors["hotels"] = search_errors.get(key, "timeout")
+        if errors:
+            result["errors"] = errors
+        results.append(result)
+
+    logger.info("[✅ API Batch] %s résultat(s) | %s ville(s) | %s recherche(s) amont",
+                len(results), len(lookups), len(searches))
+    with metrics.span("serialize"):
+        return jsonify({"results": results}), 200
+
+if __name__ == "__main__":
+    app.run(port=5003, debug=False)